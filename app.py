@@ -2,16 +2,30 @@
 Teacher Assistant Dashboard - Main Application
 A Streamlit dashboard for managing student records and generating automated emails.
 """
+import io
+import os
+import threading
+import time
 import streamlit as st
 import pandas as pd
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from utils.analytics_cubes import FREQUENCIES, frequency_label
+from utils.attendance_matrix import CHRONIC_ABSENCE_THRESHOLD, STATUS_CODES
+from utils.data_entry import INCIDENT_TYPES, SEVERITIES, attendance_rows, behavior_rows
 from utils.data_loader import (
-    load_all_data,
-    get_student_summary,
     calculate_student_average,
     calculate_attendance_rate,
     count_behavior_incidents
 )
 from utils.email_generator import EmailGenerator
+from utils.progress_reports import generate_reports, make_executor
+from utils.snapshot_history import class_history, student_history
+from utils.tenancy import TenantCache, admin_mode, list_tenants, tenant_for_token
+from utils.threshold_explorer import ThresholdExplorer
+
+# Time to first paint is measured from the start of each rerun
+rerun_started = time.perf_counter()
 
 # Page configuration
 st.set_page_config(
@@ -29,32 +43,134 @@ if 'email_generator' not in st.session_state:
     )
 
 # Load data
-@st.cache_data
-def get_data():
-    """Load and cache all data."""
-    return load_all_data()
+@st.cache_resource
+def get_tenant_cache():
+    """Process-wide cache of each teacher's data store, shared by every session."""
+    return TenantCache()
+
+@st.cache_resource
+def get_chart_lock():
+    """Serializes chart rendering: Streamlit's charts register a process-global Altair
+    data transformer, so concurrent sessions could otherwise swap each other's chart data."""
+    return threading.Lock()
+
+# Report rendering processes shared by every session of this server
+REPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+@st.cache_resource
+def get_report_executor():
+    """One bounded, spawn-based process pool per server; requests queue for its workers."""
+    return make_executor(REPORT_WORKERS)
+
+@st.cache_resource(max_entries=8)
+def get_threshold_explorer(tenant, version, _summaries, _alerts):
+    """Presorted metric arrays for the what-if panel, one per tenant and data version."""
+    return ThresholdExplorer(_summaries, _alerts)
+
+@st.cache_resource(max_entries=8)
+def get_history(tenant, fingerprint, _history):
+    """Stored daily summaries, loaded once per tenant until a snapshot is written or removed."""
+    return _history.load_all()
+
+# Beyond this many rows the per-student sparkline column is skipped
+SPARKLINE_MAX_STUDENTS = 2000
+
+# Derived artifacts each page reads; a snapshot builds them on first use
+PAGE_ARTIFACTS = {
+    "Dashboard": ("summaries", "cubes"),
+    "Student Records": ("student_index", "summaries"),
+    "Email Generator": ("student_index", "summaries", "alerts"),
+    "Batch Email Generation": ("summaries", "alerts"),
+    "Data Entry": ("attendance_matrix", "student_index"),
+}
+# Page usually opened next, whose artifacts are prefetched in the background
+NEXT_PAGE = {
+    "Dashboard": "Student Records",
+    "Student Records": "Email Generator",
+    "Email Generator": "Batch Email Generation",
+    "Batch Email Generation": "Email Generator",
+    "Data Entry": "Dashboard",
+}
 
-@st.cache_data
-def get_all_student_summaries():
-    """Load and cache all student summaries."""
-    students_df, _, _, _ = get_data()
-    summaries = []
-    for _, student in students_df.iterrows():
-        student_id = student['student_id']
-        summaries.append(get_student_summary(student_id))
-    return summaries
+def select_student(key):
+    """Search box plus selector; returns the chosen student's row."""
+    index = data.student_index
+    query = st.text_input("Search by name, student ID or email", key=f"{key}_search")
+    matches = index.search(query)
+    if not matches:
+        st.warning(f"No students match '{query}'")
+        st.stop()
+    if len(index) > len(matches):
+        st.caption(f"Showing {len(matches)} of {len(index)} students. Type to narrow the list.")
+    
+    # Options are the display labels themselves (mapped back to IDs), which keeps
+    # widget state restorable without format_func
+    labels = {index.label(student_id): student_id for student_id in matches}
+    student_id = labels[st.selectbox("Select a student", list(labels), key=key)]
+    return students_df.iloc[index.position(student_id)]
+
+def get_send_flags(email_gen):
+    """Send flags for every summary, from the warm results when available."""
+    if precomputed is not None and email_gen.has_default_thresholds():
+        return precomputed.send_flags
+    return [
+        email_gen.should_send_email(summary, data.alerts.for_student(position))
+        for position, summary in enumerate(data.summaries)
+    ]
 
-students_df, grades_df, attendance_df, behavior_df = get_data()
+def get_emails(email_gen, student_id):
+    """Generated emails for one student, from the warm results when available."""
+    position = data.student_index.position(student_id)
+    if precomputed is not None and email_gen.has_default_thresholds():
+        rendered = precomputed.emails_for(email_gen.teacher_name, email_gen.teacher_email)
+        if rendered is not None:
+            return rendered[position]
+    return email_gen.generate_all_emails(data.summaries[position], data.alerts.for_student(position))
 
 # Sidebar navigation
 st.sidebar.title("📚 Teacher Assistant")
+
+# Tenant selection: each teacher's roster lives in data/tenants/<name>/;
+# without tenant folders the app serves data/ directly. A session sees exactly
+# the tenant its access token belongs to; only admin mode lists every tenant.
+tenants = list_tenants()
+query_params = st.experimental_get_query_params()
+if not tenants:
+    tenant = None
+elif admin_mode():
+    requested_tenant = query_params.get("tenant", [None])[0]
+    tenant = st.sidebar.selectbox(
+        "👤 Teacher Login (admin mode)",
+        tenants,
+        index=tenants.index(requested_tenant) if requested_tenant in tenants else 0
+    )
+else:
+    tenant = tenant_for_token(query_params.get("token", [None])[0])
+    if tenant is None:
+        st.title("📚 Teacher Assistant Dashboard")
+        st.error("🔒 Please open the dashboard with your personal access link. "
+                 "Ask your administrator for one if you don't have it.")
+        st.stop()
+    st.sidebar.markdown(f"👤 Signed in as **{tenant}**")
 st.sidebar.markdown("---")
 
+# Every session of a tenant reads the same immutable snapshot; hold one reference per rerun
+tenant_cache = get_tenant_cache()
+tenant_entry = tenant_cache.get(tenant)
+data_store, worker = tenant_entry.store, tenant_entry.worker
+data = data_store.snapshot
+students_df, grades_df, attendance_df, behavior_df = data.students, data.grades, data.attendance, data.behavior
+
 page = st.sidebar.radio(
     "Navigation",
-    ["Dashboard", "Student Records", "Email Generator", "Batch Email Generation"]
+    list(PAGE_ARTIFACTS)
 )
 
+# Build only what this page reads, then warm the likely next page off the render path
+data.require(*PAGE_ARTIFACTS[page])
+page_ready_ms = (time.perf_counter() - rerun_started) * 1000
+data_store.prefetch(PAGE_ARTIFACTS[NEXT_PAGE[page]])
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Settings")
 teacher_name = st.sidebar.text_input("Teacher Name", value="Mr./Ms. Teacher")
@@ -62,7 +178,46 @@ teacher_email = st.sidebar.text_input("Teacher Email", value="teacher@school.edu
 
 if teacher_name != st.session_state.email_generator.teacher_name or \
    teacher_email != st.session_state.email_generator.teacher_email:
+    thresholds = st.session_state.email_generator.thresholds
     st.session_state.email_generator = EmailGenerator(teacher_name, teacher_email)
+    st.session_state.email_generator.apply_thresholds(**thresholds)
+
+worker.register_profile(teacher_name, teacher_email)
+
+# Precomputed flags/emails for the snapshot this rerun is rendering, if ready
+precomputed = data_store.precomputed
+if precomputed is not None and precomputed.version != data.version:
+    precomputed = None
+
+st.sidebar.markdown("### Data Status")
+if worker.is_stale:
+    st.sidebar.warning("🟡 Data files changed, refreshing...")
+elif precomputed is None:
+    st.sidebar.info("🔵 Preparing summaries and emails...")
+else:
+    st.sidebar.success(f"🟢 Up to date (checked {worker.last_checked:%H:%M:%S})")
+st.sidebar.caption(f"Data version {data.version}, loaded {data.loaded_at:%Y-%m-%d %H:%M:%S}")
+st.sidebar.caption(f"{page} data ready in {page_ready_ms:.0f} ms")
+for warning in data.warnings:
+    st.sidebar.warning(f"⚠️ {warning}")
+# Alert rules are evaluated lazily; report errors once some page has needed them
+if 'alerts' in data.artifacts and data.alerts.error:
+    st.sidebar.error(f"Alert rules not applied: {data.alerts.error}")
+if worker.last_error:
+    st.sidebar.error(f"Background refresh failed: {worker.last_error}")
+if st.sidebar.button("🔄 Reload Data"):
+    data_store.reload()
+    worker.wake()
+    st.rerun()
+
+with st.sidebar.expander("Cache Stats"):
+    stats = tenant_cache.stats()
+    st.write(f"Tenants in memory: {stats['tenants_loaded']} "
+             f"({stats['memory_mb']:.1f} / {stats['budget_mb']:.0f} MB)")
+    st.write(f"Hits: {stats['hits']}, misses: {stats['misses']}, evictions: {stats['evictions']} "
+             f"(hit rate {stats['hit_rate']:.0%})")
+    if tenant in tenant_cache.last_cold_load:
+        st.write(f"Last cold load of this roster: {tenant_cache.last_cold_load[tenant]:.2f}s")
 
 # Main content
 if page == "Dashboard":
@@ -70,29 +225,109 @@ if page == "Dashboard":
     st.markdown("### Student Performance Overview")
     
     # Get cached summary statistics for all students
-    summary_data = get_all_student_summaries()
-    summary_df = pd.DataFrame(summary_data)
+    summary_df = data.summaries.frame
+    
+    # Week-over-week deltas compare against the stored snapshot from a week ago
+    history = get_history(tenant, worker.history.fingerprint(), worker.history)
+    week_ago = [day for day in history if day <= date.today() - timedelta(days=7)]
+    baseline = class_history({week_ago[-1]: history[week_ago[-1]]}).iloc[0] if week_ago else None
+    
+    def week_delta(current, column, fmt="{:+.1f}"):
+        if baseline is None or pd.isna(current) or pd.isna(baseline[column]):
+            return None
+        return fmt.format(current - baseline[column])
     
     # Display key metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Students", len(students_df))
+        st.metric("Total Students", len(students_df), delta=week_delta(len(students_df), 'students', "{:+.0f}"))
     
     with col2:
         avg_grade = summary_df['average_grade'].mean()
-        st.metric("Class Average", f"{avg_grade:.1f}%")
+        st.metric("Class Average", f"{avg_grade:.1f}%", delta=week_delta(avg_grade, 'class_average'))
     
     with col3:
         avg_attendance = summary_df['attendance_rate'].mean()
-        st.metric("Average Attendance", f"{avg_attendance:.1f}%")
+        st.metric("Average Attendance", f"{avg_attendance:.1f}%",
+                  delta=week_delta(avg_attendance, 'average_attendance'))
     
     with col4:
         students_at_risk = len(summary_df[
             (summary_df['average_grade'] < 70) | 
             (summary_df['attendance_rate'] < 80)
         ])
-        st.metric("Students At Risk", students_at_risk)
+        st.metric("Students At Risk", students_at_risk,
+                  delta=week_delta(students_at_risk, 'at_risk', "{:+.0f}"), delta_color="inverse")
+    
+    if baseline is not None:
+        st.caption(f"Changes are compared with {week_ago[-1]:%B %d, %Y}.")
+    if len(history) > 1:
+        with st.expander("📈 Class history"):
+            class_df = class_history(history)
+            with get_chart_lock():
+                st.line_chart(class_df[['class_average', 'average_attendance']].round(1)
+                              .rename(columns={'class_average': 'Class Average (%)',
+                                               'average_attendance': 'Average Attendance (%)'}))
+                st.bar_chart(class_df['at_risk'].rename('Students At Risk'))
+    
+    chronic_count = int(summary_df['chronic_absence'].sum())
+    if chronic_count:
+        st.caption(
+            f"⚠️ {chronic_count} student(s) chronically absent "
+            f"(missed {CHRONIC_ABSENCE_THRESHOLD:.0%} or more of school days)"
+        )
+    
+    declining_df = summary_df[summary_df['declining_grades']]
+    if not declining_df.empty:
+        with st.expander(f"📉 Early warning: {len(declining_df)} student(s) with declining grades"):
+            display_declining = declining_df[['name', 'average_grade', 'baseline_average', 'recent_average', 'grade_slope']] \
+                .sort_values('grade_slope').copy()
+            display_declining.columns = ['Name', 'Avg Grade (%)', 'Earlier Avg (%)', 'Recent Avg (%)', 'Trend (pts/week)']
+            st.dataframe(display_declining.round(1), use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    
+    # Class trends read only from the snapshot's pre-aggregated cubes
+    st.markdown("### Class Trends")
+    cubes = data.cubes
+    bucket_labels = {"Auto": None, **{label: freq for freq, label in FREQUENCIES if freq != 'D'}}
+    bucket = bucket_labels[st.selectbox("Group by", list(bucket_labels), key="trend_bucket")]
+    
+    tab1, tab2, tab3 = st.tabs(["📝 Grades", "📅 Attendance", "⚠️ Behavior"])
+    with tab1:
+        grade_trend = cubes.grade_trend(bucket)
+        if grade_trend.empty:
+            st.info("No grades recorded yet.")
+        else:
+            st.caption(f"Class average (%) by {frequency_label(grade_trend.attrs['freq']).lower()} and assignment type")
+            with get_chart_lock():
+                st.line_chart(grade_trend.round(1))
+    with tab2:
+        attendance_trend = cubes.attendance_trend(bucket)
+        if attendance_trend.empty:
+            st.info("No attendance recorded yet.")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.caption(f"Share of recorded days by status (%), per {frequency_label(attendance_trend.attrs['freq']).lower()}")
+                with get_chart_lock():
+                    st.area_chart(attendance_trend.round(1))
+            with col2:
+                st.caption("Share of recorded days by status (%), per day of week")
+                weekday = cubes.attendance_by_weekday().round(1)
+                with get_chart_lock():
+                    st.bar_chart(weekday)
+    with tab3:
+        splits = {"Incident type": "incident_type", "Severity": "severity"}
+        split = splits[st.radio("Split incidents by", list(splits), horizontal=True)]
+        incident_trend = cubes.incident_trend(split, bucket)
+        if incident_trend.empty:
+            st.info("No behavior incidents recorded yet.")
+        else:
+            st.caption(f"Incidents per {frequency_label(incident_trend.attrs['freq']).lower()}")
+            with get_chart_lock():
+                st.bar_chart(incident_trend)
     
     st.markdown("---")
     
@@ -127,8 +362,13 @@ if page == "Dashboard":
         
         return colors
     
+    column_config = {}
+    if len(history) > 1 and len(display_df) <= SPARKLINE_MAX_STUDENTS:
+        display_df['Grade History'] = student_history(history, 'average_grade', summary_df['student_id'])
+        column_config['Grade History'] = st.column_config.LineChartColumn("Grade History", y_min=0, y_max=100)
+    
     styled_df = display_df.style.apply(highlight_performance, axis=1)
-    st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    st.dataframe(styled_df, use_container_width=True, hide_index=True, column_config=column_config)
     
     st.markdown("""
     **Color Legend:**
@@ -140,15 +380,7 @@ elif page == "Student Records":
     st.title("📋 Student Records")
     
     # Student selector
-    student_names = students_df['name'].tolist()
-    selected_student_name = st.selectbox("Select a student", student_names)
-    
-    # Get student details
-    student_rows = students_df[students_df['name'] == selected_student_name]
-    if len(student_rows) == 0:
-        st.error(f"Student '{selected_student_name}' not found")
-        st.stop()
-    student = student_rows.iloc[0]
+    student = select_student("records_student")
     student_id = student['student_id']
     
     # Display student information
@@ -169,7 +401,7 @@ elif page == "Student Records":
     st.markdown("---")
     
     # Performance summary
-    summary = get_student_summary(student_id)
+    summary = data.summary(student_id)
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -198,6 +430,12 @@ elif page == "Student Records":
             display_grades = student_grades[['date', 'assignment_name', 'assignment_type', 'score', 'max_score', 'percentage']]
             display_grades.columns = ['Date', 'Assignment', 'Type', 'Score', 'Max Score', 'Percentage']
             st.dataframe(display_grades, use_container_width=True, hide_index=True)
+            
+            if not (pd.isna(summary['grade_slope']) or pd.isna(summary['baseline_average'])):
+                st.write(f"**Trend:** {summary['grade_slope']:+.1f} points per week; recent assignments average "
+                         f"{summary['recent_average']:.1f}% vs {summary['baseline_average']:.1f}% earlier")
+            if summary['declining_grades']:
+                st.warning("📉 Grades are declining. Consider reaching out before the average drops further.")
         else:
             st.info("No grade records found.")
     
@@ -214,6 +452,10 @@ elif page == "Student Records":
             st.markdown("**Attendance Summary:**")
             for status, count in status_counts.items():
                 st.write(f"- {status.capitalize()}: {count}")
+            st.write(f"- Tardy rate: {summary['tardy_rate']:.1f}%, excused rate: {summary['excused_rate']:.1f}%")
+            st.write(f"- Longest run of missed days: {summary['longest_absence_streak']}")
+            if summary['chronic_absence']:
+                st.warning(f"Chronically absent: missed {CHRONIC_ABSENCE_THRESHOLD:.0%} or more of school days")
         else:
             st.info("No attendance records found.")
     
@@ -232,17 +474,9 @@ elif page == "Email Generator":
     st.markdown("Generate personalized emails for students, parents, and administrators.")
     
     # Student selector
-    student_names = students_df['name'].tolist()
-    selected_student_name = st.selectbox("Select a student", student_names)
-    
-    # Get student details
-    student_rows = students_df[students_df['name'] == selected_student_name]
-    if len(student_rows) == 0:
-        st.error(f"Student '{selected_student_name}' not found")
-        st.stop()
-    student = student_rows.iloc[0]
+    student = select_student("email_student")
     student_id = student['student_id']
-    summary = get_student_summary(student_id)
+    summary = data.summary(student_id)
     
     st.markdown("---")
     st.markdown(f"### Student Performance Summary: {summary['name']}")
@@ -259,7 +493,13 @@ elif page == "Email Generator":
     
     # Check which emails should be sent
     email_gen = st.session_state.email_generator
-    should_send = email_gen.should_send_email(summary)
+    should_send = get_send_flags(email_gen)[data.student_index.position(student_id)]
+    
+    triggered_alerts = data.alerts.for_student(data.student_index.position(student_id))
+    if triggered_alerts:
+        st.markdown("### Alert Rules Triggered")
+        for alert in triggered_alerts:
+            st.write(f"- **{alert['rule']}**: {alert['message']} (notifies {', '.join(alert['notify'])})")
     
     st.markdown("### Recommended Communications")
     col1, col2, col3 = st.columns(3)
@@ -273,7 +513,7 @@ elif page == "Email Generator":
     st.markdown("---")
     
     # Generate and display emails
-    emails = email_gen.generate_all_emails(summary)
+    emails = get_emails(email_gen, student_id)
     
     if emails:
         st.markdown("### Generated Emails")
@@ -300,14 +540,87 @@ elif page == "Batch Email Generation":
     st.title("📬 Batch Email Generation")
     st.markdown("Generate emails for all students who need attention.")
     
-    # Calculate which students need emails using cached summaries
-    students_needing_attention = []
     email_gen = st.session_state.email_generator
     
-    all_summaries = get_all_student_summaries()
-    for summary in all_summaries:
-        should_send = email_gen.should_send_email(summary)
+    # What-if panel: counts come from presorted arrays, so sliders stay instant
+    with st.expander("🎚️ What-if Thresholds"):
+        explorer = get_threshold_explorer(tenant, data.version, data.summaries, data.alerts)
+        current = email_gen.thresholds
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            low_grade = st.slider("Low grade (%)", 0.0, 100.0, float(current['LOW_GRADE_THRESHOLD']), 1.0)
+            critical_grade = st.slider("Critical grade (%)", 0.0, 100.0, float(current['CRITICAL_GRADE_THRESHOLD']), 1.0)
+        with col2:
+            low_attendance = st.slider("Low attendance (%)", 0.0, 100.0, float(current['LOW_ATTENDANCE_THRESHOLD']), 1.0)
+            critical_attendance = st.slider("Critical attendance (%)", 0.0, 100.0, float(current['CRITICAL_ATTENDANCE_THRESHOLD']), 1.0)
+        with col3:
+            multiple_incidents = st.slider("Incidents for parent email", 1, 10, int(current['MULTIPLE_INCIDENTS_THRESHOLD']))
+            st.caption(f"{explorer.at_least_incidents(multiple_incidents)} student(s) with {multiple_incidents}+ incidents")
+            admin_incidents = st.slider("Incidents for admin email", 1, 10, int(current['ADMIN_INCIDENTS_THRESHOLD']))
+            st.caption(f"{explorer.at_least_incidents(admin_incidents)} student(s) with {admin_incidents}+ incidents")
+        
+        what_if = {
+            'LOW_GRADE_THRESHOLD': low_grade,
+            'CRITICAL_GRADE_THRESHOLD': critical_grade,
+            'LOW_ATTENDANCE_THRESHOLD': low_attendance,
+            'CRITICAL_ATTENDANCE_THRESHOLD': critical_attendance,
+            'MULTIPLE_INCIDENTS_THRESHOLD': multiple_incidents,
+            'ADMIN_INCIDENTS_THRESHOLD': admin_incidents,
+        }
+        counts = explorer.counts(what_if)
+        baseline = explorer.counts(current)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Parent Emails", counts['to_parent'], delta=counts['to_parent'] - baseline['to_parent'], delta_color="off")
+        with col2:
+            st.metric("Student Emails", counts['to_student'], delta=counts['to_student'] - baseline['to_student'], delta_color="off")
+        with col3:
+            st.metric("Admin Emails", counts['to_admin'], delta=counts['to_admin'] - baseline['to_admin'], delta_color="off")
+        with col4:
+            st.metric("Students Contacted", counts['any'], delta=counts['any'] - baseline['any'], delta_color="off")
         
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Apply These Thresholds"):
+                email_gen.apply_thresholds(**what_if)
+                st.rerun()
+        with col2:
+            if st.button("Reset to Defaults"):
+                email_gen.apply_thresholds(**EmailGenerator().thresholds)
+                st.rerun()
+    
+    with st.expander("🗂️ Progress Reports"):
+        st.markdown("A printable HTML report for every student, rendered in parallel and bundled into one zip file.")
+        if st.button(f"Generate Reports for All {len(data.summaries)} Students"):
+            progress_bar = st.progress(0.0, text="Rendering reports...")
+            reports_zip = io.BytesIO()
+            try:
+                stats = generate_reports(
+                    data, reports_zip, teacher_name=email_gen.teacher_name,
+                    workers=REPORT_WORKERS, executor=get_report_executor(),
+                    progress=lambda done, total: progress_bar.progress(done / total, text=f"{done}/{total} reports")
+                )
+                st.session_state.progress_reports = (data.version, reports_zip.getvalue(), stats)
+            except BrokenProcessPool:
+                # A worker died; the next click starts a fresh pool
+                get_report_executor.clear()
+                st.error("Report rendering failed. Please try again.")
+        
+        if 'progress_reports' in st.session_state:
+            version, reports, stats = st.session_state.progress_reports
+            st.write(f"{stats['reports']} reports in {stats['seconds']:.1f}s "
+                     f"(per report: mean {stats['mean_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms)")
+            if version != data.version:
+                st.caption("Data has changed since these reports were generated.")
+            st.download_button("⬇️ Download Reports (.zip)", reports,
+                               file_name=f"progress_reports_{date.today():%Y-%m-%d}.zip",
+                               mime="application/zip")
+    
+    # Calculate which students need emails using cached summaries
+    students_needing_attention = []
+    
+    for summary, should_send in zip(data.summaries, get_send_flags(email_gen)):
         if should_send['to_parent'] or should_send['to_student'] or should_send['to_admin']:
             students_needing_attention.append({
                 'student_id': summary['student_id'],
@@ -341,8 +654,8 @@ elif page == "Batch Email Generation":
             
             for student_info in students_needing_attention:
                 student_id = student_info['student_id']
-                summary = get_student_summary(student_id)
-                emails = email_gen.generate_all_emails(summary)
+                summary = data.summary(student_id)
+                emails = get_emails(email_gen, student_id)
                 
                 st.markdown(f"## {summary['name']}")
                 
@@ -365,6 +678,86 @@ elif page == "Batch Email Generation":
         st.success("🎉 Great news! No students currently require attention emails.")
         st.info("All students are performing within acceptable parameters.")
 
+elif page == "Data Entry":
+    st.title("📝 Data Entry")
+    st.markdown("Record attendance and behavior. Entries are appended to the data files and show up immediately.")
+    
+    if 'entry_message' in st.session_state:
+        st.success(st.session_state.pop('entry_message'))
+    
+    tab1, tab2 = st.tabs(["📅 Take Roll", "⚠️ Log Behavior"])
+    
+    with tab1:
+        col1, col2 = st.columns(2)
+        with col1:
+            roll_date = st.date_input("Date", value=date.today(), key="roll_date")
+        with col2:
+            grade_levels = sorted(students_df['grade_level'].unique())
+            grade_level = st.selectbox("Class (grade level)", grade_levels, key="roll_grade_level")
+        
+        in_class = (students_df['grade_level'] == grade_level).to_numpy()
+        roster = students_df.loc[in_class, ['student_id', 'name']].copy()
+        
+        # Start from what is already recorded for that day, otherwise everyone present
+        # (attendance matrix rows follow the roster order)
+        matrix = data.attendance_matrix
+        day = matrix.days.get_indexer([pd.Timestamp(roll_date)])[0]
+        status_names = {code: status for status, code in STATUS_CODES.items()}
+        if day >= 0:
+            roster['status'] = [status_names.get(code, 'present') for code in matrix.codes[in_class, day]]
+            st.caption("Attendance was already taken for this day; saving adds a new entry that replaces it.")
+        else:
+            roster['status'] = 'present'
+        roster['notes'] = ''
+        
+        roll = st.data_editor(
+            roster,
+            column_config={
+                'student_id': "Student ID",
+                'name': "Name",
+                'status': st.column_config.SelectboxColumn("Status", options=list(STATUS_CODES), required=True),
+                'notes': "Notes",
+            },
+            disabled=['student_id', 'name'],
+            hide_index=True,
+            use_container_width=True,
+            key=f"roll_{grade_level}_{roll_date}"
+        )
+        
+        if st.button("Save Roll", type="primary"):
+            try:
+                data_store.append(attendance=attendance_rows(roll['student_id'], roll_date, roll['status'], roll['notes']))
+            except (ValueError, OSError) as e:
+                st.error(f"❌ Roll not saved: {e}")
+            else:
+                worker.wake()
+                st.session_state.entry_message = f"✅ Saved attendance for {len(roll)} students on {roll_date:%Y-%m-%d}"
+                st.rerun()
+    
+    with tab2:
+        student = select_student("behavior_student")
+        with st.form("behavior_form", clear_on_submit=True):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                incident_date = st.date_input("Date", value=date.today())
+            with col2:
+                incident_type = st.selectbox("Type", INCIDENT_TYPES)
+            with col3:
+                severity = st.selectbox("Severity", SEVERITIES)
+            description = st.text_area("Description")
+            submitted = st.form_submit_button("Log Incident", type="primary")
+        
+        if submitted:
+            try:
+                data_store.append(behavior=behavior_rows(student['student_id'], incident_date, incident_type,
+                                                         severity, description))
+            except (ValueError, OSError) as e:
+                st.error(f"❌ Incident not saved: {e}")
+            else:
+                worker.wake()
+                st.session_state.entry_message = f"✅ Logged {incident_type} incident for {student['name']}"
+                st.rerun()
+
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.markdown("### About")
@@ -0,0 +1,289 @@
+"""
+Configurable alert rules for triggering emails.
+
+Rules are declared in JSON (or YAML, if PyYAML is installed), for example:
+
+    {"rules": [
+        {"name": "exam_slump",
+         "when": "average('exam') < 65 and attendance_rate > 90",
+         "notify": ["parent", "student"],
+         "message": "exam scores have dropped despite good attendance"},
+        {"name": "frequent_tardies",
+         "when": "window('tardy', 10) >= 3",
+         "notify": ["parent"],
+         "message": "three or more tardies within ten school days"}
+    ]}
+
+Each ``when`` expression is parsed and checked once, then compiled into a
+single array expression over the whole roster: ``and``/``or``/``not``
+become element-wise ``&``/``|``/``~`` on ``operand != 0``, and feature calls become arrays
+computed once and shared by every rule that uses them.
+
+Available names are the numeric summary columns (``average_grade``,
+``attendance_rate``, ``negative_incidents``, ...) and these features:
+
+    average(type)          average percentage for one assignment type
+    recent(status, days)   attendance days with status in the last N school days
+    window(status, days)   most days with status in any N consecutive school days
+    incidents(type)        behavior incidents of one type
+"""
+import ast
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.attendance_matrix import STATUS_CODES, AttendanceMatrix
+from utils.summary_table import SummaryTable
+
+NOTIFY_TIERS = {'parent': 'to_parent', 'student': 'to_student', 'admin': 'to_admin'}
+
+FEATURE_FUNCTIONS = {'average': 1, 'recent': 2, 'window': 2, 'incidents': 1}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Compare, ast.Lt, ast.LtE,
+    ast.Gt, ast.GtE, ast.Eq, ast.NotEq, ast.Name, ast.Load, ast.Constant, ast.Call,
+)
+
+
+class RuleError(ValueError):
+    """Raised when a rule definition is malformed."""
+
+
+def _feature_key(call: ast.Call) -> str:
+    """Name under which a feature call's array is bound, e.g. window__tardy__10."""
+    if not isinstance(call.func, ast.Name) or call.func.id not in FEATURE_FUNCTIONS:
+        raise RuleError(f"Unknown function in rule: {ast.unparse(call.func)}")
+    name = call.func.id
+    if len(call.args) != FEATURE_FUNCTIONS[name] or call.keywords:
+        raise RuleError(f"{name}() takes {FEATURE_FUNCTIONS[name]} positional argument(s)")
+    args = []
+    for arg in call.args:
+        if not isinstance(arg, ast.Constant) or not isinstance(arg.value, (str, int)):
+            raise RuleError(f"Arguments to {name}() must be literal strings or integers")
+        args.append(str(arg.value))
+    return '__'.join([name] + args)
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite a boolean rule into element-wise array operations."""
+
+    def __init__(self):
+        self.features = set()
+
+    @staticmethod
+    def _truth(node):
+        # Bitwise operators only act as logic on booleans, so numbers become x != 0
+        return ast.Compare(left=node, ops=[ast.NotEq()], comparators=[ast.Constant(0)])
+
+    def visit_BoolOp(self, node):
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        values = [self._truth(self.visit(value)) for value in node.values]
+        result = values[0]
+        for value in values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=self._truth(operand))
+        return ast.UnaryOp(op=node.op, operand=operand)
+
+    def visit_Compare(self, node):
+        # a < b < c  ->  (a < b) & (b < c)
+        operands = [self.visit(node.left)] + [self.visit(c) for c in node.comparators]
+        result = None
+        for left, op, right in zip(operands, node.ops, operands[1:]):
+            pair = ast.Compare(left=left, ops=[op], comparators=[right])
+            result = pair if result is None else ast.BinOp(left=result, op=ast.BitAnd(), right=pair)
+        return result
+
+    def visit_Call(self, node):
+        key = _feature_key(node)
+        self.features.add(key)
+        return ast.Name(id=key, ctx=ast.Load())
+
+    def visit_Name(self, node):
+        self.features.add(node.id)
+        return node
+
+
+class AlertRule:
+    """One compiled rule: a roster-wide boolean expression plus routing."""
+
+    def __init__(self, name: str, when: str, notify: List[str], message: str = ""):
+        unknown = [tier for tier in notify if tier not in NOTIFY_TIERS]
+        if not notify or unknown:
+            raise RuleError(f"Rule '{name}' must notify some of {list(NOTIFY_TIERS)}, got {notify}")
+        self.name = name
+        self.when = when
+        self.notify = list(notify)
+        self.message = message or name.replace('_', ' ')
+
+        try:
+            tree = ast.parse(when, mode='eval')
+        except SyntaxError as e:
+            raise RuleError(f"Rule '{name}' has invalid syntax: {e.msg}") from e
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise RuleError(f"Rule '{name}' uses unsupported syntax: {type(node).__name__}")
+
+        vectorize = _Vectorize()
+        tree = ast.fix_missing_locations(vectorize.visit(tree))
+        self.features = vectorize.features
+        self._code = compile(tree, f"<rule {name}>", 'eval')
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> 'AlertRule':
+        missing = [key for key in ('name', 'when', 'notify') if key not in spec]
+        if missing:
+            raise RuleError(f"Rule definition missing {missing}: {spec}")
+        return cls(spec['name'], spec['when'], spec['notify'], spec.get('message', ''))
+
+    def evaluate(self, features: 'FeatureFrame') -> np.ndarray:
+        """Boolean mask over the roster for this rule."""
+        namespace = {key: features[key] for key in self.features}
+        try:
+            result = eval(self._code, {'__builtins__': {}}, namespace)
+            return np.broadcast_to(np.asarray(result, dtype=bool), (len(features),))
+        except RuleError:
+            raise
+        except Exception as e:
+            # e.g. comparing a text column with a number
+            raise RuleError(f"Rule '{self.name}' could not be evaluated: {e}") from e
+
+
+def load_alert_rules(path: str) -> List[AlertRule]:
+    """Load and compile rules from a .json, .yaml or .yml file."""
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError as e:
+                raise RuleError("PyYAML is required for YAML rule files (pip install pyyaml)") from e
+            try:
+                config = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise RuleError(f"Could not parse {path}: {e}") from e
+        else:
+            try:
+                config = json.load(f)
+            except json.JSONDecodeError as e:
+                raise RuleError(f"Could not parse {path}: {e}") from e
+
+    specs = config.get('rules', []) if isinstance(config, dict) else config
+    rules = [AlertRule.from_dict(spec) for spec in specs]
+    names = [rule.name for rule in rules]
+    if len(set(names)) != len(names):
+        raise RuleError(f"Duplicate rule names in {path}")
+    return rules
+
+
+class FeatureFrame:
+    """Roster-aligned arrays that rules can reference, computed on first use."""
+
+    def __init__(self, summaries: SummaryTable, grades_df: pd.DataFrame,
+                 attendance_matrix: AttendanceMatrix, behavior_df: pd.DataFrame):
+        self.summaries = summaries
+        self.grades_df = grades_df
+        self.attendance_matrix = attendance_matrix
+        self.behavior_df = behavior_df
+        self.student_ids = pd.Index(summaries.column('student_id'))
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.summaries)
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        if key not in self._cache:
+            self._cache[key] = self._compute(key)
+        return self._cache[key]
+
+    def _compute(self, key: str) -> np.ndarray:
+        name, *args = key.split('__')
+        if not args:
+            if name not in self.summaries.columns:
+                raise RuleError(f"Unknown name in rule: {name}")
+            return np.asarray(self.summaries.frame[name])
+        if name == 'average':
+            return self._average(args[0])
+        if name == 'incidents':
+            matching = self.behavior_df.loc[self.behavior_df['incident_type'] == args[0], 'student_id']
+            return matching.value_counts().reindex(self.student_ids, fill_value=0).to_numpy()
+        if args[0] not in STATUS_CODES:
+            raise RuleError(f"Unknown attendance status in rule: {args[0]}")
+        days = int(args[1])
+        if days <= 0:
+            raise RuleError(f"{name}() needs a positive number of days")
+        hits = self.attendance_matrix.codes == STATUS_CODES[args[0]]
+        if name == 'recent':
+            return hits[:, -days:].sum(axis=1)
+        # window: best sum over any `days` consecutive columns
+        totals = np.concatenate(
+            [np.zeros((len(hits), 1), dtype=np.int32), np.cumsum(hits, axis=1, dtype=np.int32)], axis=1
+        )
+        if days >= hits.shape[1]:
+            return totals[:, -1]
+        return (totals[:, days:] - totals[:, :-days]).max(axis=1)
+
+    def _average(self, assignment_type: str) -> np.ndarray:
+        """Average percentage per student for one type; NaN if none, so comparisons are False."""
+        grades = self.grades_df[self.grades_df['assignment_type'] == assignment_type]
+        percentage = grades['score'] / grades['max_score'] * 100
+        return percentage.groupby(grades['student_id']).mean().reindex(self.student_ids).to_numpy()
+
+
+class AlertResults:
+    """Rule masks for one data version."""
+
+    def __init__(self, rules: List[AlertRule], masks: np.ndarray, error: Optional[str] = None):
+        self.rules = rules
+        self.masks = masks
+        self.error = error
+
+    @classmethod
+    def empty(cls, size: int, error: Optional[str] = None) -> 'AlertResults':
+        return cls([], np.zeros((0, size), dtype=bool), error)
+
+    def tier_masks(self) -> Dict[str, np.ndarray]:
+        """Per send-flag tier, students triggered by at least one routed rule."""
+        size = self.masks.shape[1]
+        tiers = {flag: np.zeros(size, dtype=bool) for flag in NOTIFY_TIERS.values()}
+        for rule, mask in zip(self.rules, self.masks):
+            for tier in rule.notify:
+                tiers[NOTIFY_TIERS[tier]] |= mask
+        return tiers
+
+    def for_student(self, position: int) -> List[Dict]:
+        """Triggered alerts for one roster position, as passed to EmailGenerator."""
+        return [
+            {'rule': rule.name, 'message': rule.message, 'notify': rule.notify}
+            for rule, hit in zip(self.rules, self.masks[:, position]) if hit
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        return self.masks.nbytes
+
+    def counts(self) -> Dict[str, int]:
+        return {rule.name: int(mask.sum()) for rule, mask in zip(self.rules, self.masks)}
+
+
+def evaluate_rules(rules: List[AlertRule], features: FeatureFrame) -> AlertResults:
+    """One vectorized pass per rule over the whole roster."""
+    if not rules:
+        return AlertResults.empty(len(features))
+    return AlertResults(rules, np.vstack([rule.evaluate(features) for rule in rules]))
+
+
+def find_rules_file(data_dir: str) -> Optional[str]:
+    """alert_rules.json/.yaml/.yml in data_dir, if any."""
+    for filename in ('alert_rules.json', 'alert_rules.yaml', 'alert_rules.yml'):
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path):
+            return path
+    return None
@@ -0,0 +1,192 @@
+"""
+Pre-aggregated analytics cubes for class-wide charts.
+
+Each cube holds additive measures (sums and counts) per school day and
+dimension value. Cubes are built once per data version, as part of the
+shared snapshot, from the grades, attendance and behavior data. Charts
+re-bucket them into weeks, months or quarters, so a chart's cost depends
+only on the number of days and categories, not on the number of students
+or records.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.attendance_matrix import STATUS_CODES, AttendanceMatrix
+
+# Coarsest-last; the first frequency that fits under the point budget wins
+FREQUENCIES = [('D', 'Day'), ('W-MON', 'Week'), ('MS', 'Month'), ('QS', 'Quarter'), ('YS', 'Year')]
+MAX_POINTS = 2000
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def choose_frequency(dates: pd.Series, n_series: int = 1, max_points: int = MAX_POINTS,
+                     finest: str = 'D') -> str:
+    """Finest bucket frequency, no finer than ``finest``, that keeps buckets x series within max_points."""
+    candidates = [freq for freq, _ in FREQUENCIES]
+    candidates = candidates[candidates.index(finest):]
+    if dates.empty:
+        return candidates[0]
+    start, end = dates.min(), dates.max()
+    for freq in candidates:
+        # Anchored dates inside the range, plus the partial bucket at the start
+        buckets = len(pd.date_range(start, end, freq=freq)) + (freq != 'D')
+        if buckets * max(n_series, 1) <= max_points:
+            return freq
+    return FREQUENCIES[-1][0]
+
+
+def frequency_label(freq: str) -> str:
+    return dict(FREQUENCIES)[freq]
+
+
+class Cube:
+    """Long-form cube: one row per (date, dimension values) with additive measures."""
+
+    def __init__(self, frame: pd.DataFrame, dimensions: List[str], measures: List[str]):
+        self.frame = frame
+        self.dimensions = dimensions
+        self.measures = measures
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, dimensions: List[str], measures: dict) -> 'Cube':
+        """Aggregate df by date and dimensions; measures maps name -> (column, 'sum'|'count')."""
+        df = df.dropna(subset=['date'])
+        frame = (
+            df.groupby([df['date'].dt.normalize()] + [df[d] for d in dimensions], observed=True)
+            .agg(**measures)
+            .reset_index()
+        )
+        return cls(frame, dimensions, list(measures))
+
+    @classmethod
+    def from_attendance_matrix(cls, matrix: AttendanceMatrix) -> 'Cube':
+        """Days per status per school day, counted straight from the matrix columns."""
+        days = np.tile(matrix.days.to_numpy(), len(STATUS_CODES))
+        statuses = np.repeat(list(STATUS_CODES), len(matrix.days))
+        counts = np.concatenate([(matrix.codes == code).sum(axis=0) for code in STATUS_CODES.values()])
+        frame = pd.DataFrame({'date': days, 'status': statuses, 'days': counts})
+        return cls(frame[frame['days'] > 0].reset_index(drop=True), ['status'], ['days'])
+
+    def with_rows(self, df: pd.DataFrame, measures: dict) -> 'Cube':
+        """Copy with extra source rows folded in (measures must be additive)."""
+        added = Cube.build(df, self.dimensions, measures).frame
+        frame = (
+            pd.concat([self.frame, added], ignore_index=True)
+            .groupby(['date'] + self.dimensions, observed=True)[self.measures].sum()
+            .reset_index()
+        )
+        return Cube(frame, self.dimensions, self.measures)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.frame.memory_usage(index=True, deep=True).sum())
+
+    def rollup(self, by: Optional[str] = None, freq: Optional[str] = None,
+               max_points: int = MAX_POINTS, finest: str = 'D') -> pd.DataFrame:
+        """Measures per date bucket, split by one dimension (or totals when by is None).
+
+        Returns a frame indexed by bucket start with one column per measure,
+        or per (measure, dimension value) when split.
+        """
+        frame = self.frame
+        n_series = frame[by].nunique() if by else 1
+        freq = freq or choose_frequency(frame['date'], n_series, max_points, finest)
+        keys = [pd.Grouper(key='date', freq=freq, label='left', closed='left')] + ([by] if by else [])
+        rolled = frame.groupby(keys, observed=True)[self.measures].sum()
+        if by:
+            rolled = rolled.unstack(by, fill_value=0)
+        rolled.attrs['freq'] = freq
+        return rolled
+
+    def by_weekday(self, by: Optional[str] = None) -> pd.DataFrame:
+        """Measures per day of week (Monday first), optionally split by one dimension."""
+        weekday = pd.Categorical(self.frame['date'].dt.day_name(), categories=WEEKDAYS, ordered=True)
+        keys = [weekday] + ([self.frame[by]] if by else [])
+        rolled = self.frame.groupby(keys, observed=True)[self.measures].sum()
+        if by:
+            rolled = rolled.unstack(by, fill_value=0)
+        return rolled
+
+
+def _empty_trend(freq: str) -> pd.DataFrame:
+    """Trend with no buckets, for cubes without any rows yet (e.g. a new roster)."""
+    trend = pd.DataFrame(index=pd.DatetimeIndex([], name='date'))
+    trend.attrs['freq'] = freq
+    return trend
+
+
+GRADE_MEASURES = {'percentage_sum': ('percentage', 'sum'), 'grades': ('percentage', 'count')}
+BEHAVIOR_MEASURES = {'incidents': ('student_id', 'count')}
+
+
+class AnalyticsCubes:
+    """Grades, attendance and behavior cubes for one data version."""
+
+    def __init__(self, grades: Cube, attendance: Cube, behavior: Cube):
+        self.grades = grades
+        self.attendance = attendance
+        self.behavior = behavior
+
+    @classmethod
+    def build(cls, grades_df: pd.DataFrame, attendance_matrix: AttendanceMatrix,
+              behavior_df: pd.DataFrame) -> 'AnalyticsCubes':
+        grades_df = grades_df.assign(percentage=grades_df['score'] / grades_df['max_score'] * 100)
+        return cls(
+            grades=Cube.build(grades_df, ['assignment_type'], GRADE_MEASURES),
+            attendance=Cube.from_attendance_matrix(attendance_matrix),
+            behavior=Cube.build(behavior_df, ['incident_type', 'severity'], BEHAVIOR_MEASURES),
+        )
+
+    def with_appended(self, attendance_matrix: AttendanceMatrix,
+                      behavior_rows: Optional[pd.DataFrame] = None) -> 'AnalyticsCubes':
+        """Cubes after rows were appended in the app.
+
+        A new roll can replace earlier statuses, so attendance is recounted
+        from the (already updated) matrix; incidents are simply added.
+        """
+        behavior = self.behavior
+        if behavior_rows is not None and not behavior_rows.empty:
+            behavior = behavior.with_rows(behavior_rows, BEHAVIOR_MEASURES)
+        return AnalyticsCubes(self.grades, Cube.from_attendance_matrix(attendance_matrix), behavior)
+
+    @property
+    def nbytes(self) -> int:
+        return self.grades.nbytes + self.attendance.nbytes + self.behavior.nbytes
+
+    def grade_trend(self, freq: Optional[str] = None) -> pd.DataFrame:
+        """Class average percentage per bucket and assignment type."""
+        if self.grades.frame.empty:
+            return _empty_trend(freq or 'W-MON')
+        # Assignments are days apart, so daily buckets would be mostly empty
+        rolled = self.grades.rollup('assignment_type', freq, finest='W-MON')
+        trend = rolled['percentage_sum'] / rolled['grades'].where(rolled['grades'] > 0)
+        trend.attrs['freq'] = rolled.attrs['freq']
+        return trend
+
+    def attendance_trend(self, freq: Optional[str] = None) -> pd.DataFrame:
+        """Share of recorded days with each status, per bucket (percent)."""
+        if self.attendance.frame.empty:
+            return _empty_trend(freq or 'D')
+        rolled = self.attendance.rollup('status', freq)
+        days = rolled['days']
+        trend = days.div(days.sum(axis=1), axis=0) * 100
+        trend.attrs['freq'] = rolled.attrs['freq']
+        return trend
+
+    def attendance_by_weekday(self) -> pd.DataFrame:
+        """Share of recorded days with each status, per day of week (percent)."""
+        if self.attendance.frame.empty:
+            return pd.DataFrame(index=pd.Index([], dtype=str))
+        rolled = self.attendance.by_weekday('status')['days']
+        return rolled.div(rolled.sum(axis=1), axis=0) * 100
+
+    def incident_trend(self, by: str = 'incident_type', freq: Optional[str] = None) -> pd.DataFrame:
+        """Incident counts per bucket, split by incident_type or severity."""
+        if self.behavior.frame.empty:
+            return _empty_trend(freq or 'D')
+        rolled = self.behavior.rollup(by, freq)
+        trend = rolled['incidents']
+        trend.attrs['freq'] = rolled.attrs['freq']
+        return trend
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+API Load Test
+Hammers the JSON API with concurrent clients and reports requests per
+second and latency percentiles, with and without ETag revalidation
+
+Usage: python utils/api_load_test.py [--url http://127.0.0.1:8502] [--clients 16] [--seconds 10]
+"""
+
+import argparse
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+DEFAULT_PATHS = [
+    '/api/students?page=1&per_page=100',
+    '/api/students/1',
+    '/api/students/1/emails',
+    '/api/emails?page=1&per_page=50',
+]
+
+
+def client(base_url, paths, deadline, revalidate, latencies, statuses):
+    """Request paths round-robin until the deadline, recording latency per request"""
+    etags = {}
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        request = urllib.request.Request(base_url + path)
+        if revalidate and path in etags:
+            request.add_header('If-None-Match', etags[path])
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status = response.status
+                etags[path] = response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except urllib.error.URLError as e:
+            print(f"❌ Could not reach {base_url}: {e.reason}")
+            return
+        latencies.append(time.perf_counter() - start)
+        statuses.append(status)
+
+
+def run(base_url, paths, clients, seconds, revalidate):
+    latencies, statuses = [], []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=client, args=(base_url, paths, deadline, revalidate, latencies, statuses))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if not latencies:
+        return None
+    latencies_ms = np.array(latencies) * 1000
+    statuses = np.array(statuses)
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'not_modified': int((statuses == 304).sum()),
+        'errors': int((statuses >= 400).sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the read-only JSON API")
+    parser.add_argument('--url', default='http://127.0.0.1:8502')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--path', action='append', help="Path to request (repeatable)")
+    args = parser.parse_args()
+    paths = args.path or DEFAULT_PATHS
+
+    print("="*60)
+    print("🚦 API Load Test")
+    print("="*60)
+    print(f"{args.clients} clients x {args.seconds:g}s against {args.url}")
+
+    for label, revalidate in [("Full responses", False), ("ETag revalidation", True)]:
+        result = run(args.url, paths, args.clients, args.seconds, revalidate)
+        if result is None:
+            sys.exit(1)
+        print(f"\n{label}:")
+        print(f"  {result['requests']} requests, {result['rps']:.0f} req/s")
+        print(f"  p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+        print(f"  304 Not Modified: {result['not_modified']}, errors: {result['errors']}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
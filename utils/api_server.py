@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Read-only JSON API
+Serves roster summaries, student records and generated emails to other
+school systems from the same cached data layer as the dashboard
+
+Endpoints (when hosting several teachers, send the teacher's access token as
+"Authorization: Bearer <token>"; ?tenant=<name> is only honored in admin mode):
+    GET /api/students?page=1&per_page=100     roster summaries
+    GET /api/students/<id>                    summary plus grades, attendance, behavior
+    GET /api/students/<id>/emails             emails EmailGenerator would send
+    GET /api/emails?page=1&per_page=100       emails for every student needing one
+
+Responses carry an ETag and Last-Modified derived from the data version, so
+clients polling with If-None-Match / If-Modified-Since get 304 Not Modified
+until the data changes.
+
+Usage: python utils/api_server.py [--host 127.0.0.1] [--port 8502]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import traceback
+import weakref
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.email_generator import EmailGenerator
+from utils.tenancy import TenantCache, admin_mode, list_tenants, tenant_for_token
+from utils.threshold_explorer import ThresholdExplorer
+
+DEFAULT_PER_PAGE = 100
+MAX_PER_PAGE = 1000
+MAX_CACHED_SNAPSHOTS = 16
+STUDENT_PATH = re.compile(r'^/api/students/(\d+)(/emails)?$')
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Unauthorized(Exception):
+    pass
+
+
+def to_json(value):
+    """json.dumps fallback for NumPy and pandas values"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, pd.Timedelta)):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def records(df):
+    """DataFrame rows as JSON-ready dicts (dates as YYYY-MM-DD, NaN as null)"""
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d')
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
+
+
+def paginate(query, total):
+    """(start, stop, page info) from page/per_page query parameters"""
+    try:
+        page = int(query.get('page', ['1'])[0])
+        per_page = int(query.get('per_page', [str(DEFAULT_PER_PAGE)])[0])
+    except ValueError:
+        raise BadRequest("page and per_page must be integers")
+    if page < 1 or not 1 <= per_page <= MAX_PER_PAGE:
+        raise BadRequest(f"page must be >= 1 and per_page between 1 and {MAX_PER_PAGE}")
+    start = (page - 1) * per_page
+    info = {'page': page, 'per_page': per_page, 'total': total,
+            'pages': (total + per_page - 1) // per_page}
+    return start, min(start + per_page, total), info
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Routes GET requests to the cached data layer"""
+
+    server_version = "TeacherAssistantAPI/1.0"
+    tenant_cache = None
+    email_generator = EmailGenerator()
+    _positions_cache = {}
+    _positions_lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            tenant = self._tenant(query)
+            entry = self.tenant_cache.get(tenant)
+            snapshot = entry.store.snapshot
+
+            # Unknown paths, students and bad parameters fail here, before any 304
+            build_body = self._route(url.path, query, snapshot, entry.store.precomputed)
+
+            etag = f'"{tenant or "default"}-{snapshot.version}-{int(snapshot.loaded_at.timestamp())}"'
+            last_modified = snapshot.loaded_at.astimezone(timezone.utc).replace(microsecond=0)
+            if self._not_modified(etag, last_modified):
+                self._send(HTTPStatus.NOT_MODIFIED, None, etag, last_modified)
+                return
+            self._send(HTTPStatus.OK, build_body(), etag, last_modified)
+        except NotFound as e:
+            self._send(HTTPStatus.NOT_FOUND, {'error': str(e)})
+        except BadRequest as e:
+            self._send(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+        except Unauthorized as e:
+            self._send(HTTPStatus.UNAUTHORIZED, {'error': str(e)})
+        except Exception as e:
+            # Answer instead of dropping the connection; the details go to the server log
+            self.log_error("Error serving %s: %s", self.path, e)
+            traceback.print_exc()
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "Internal server error"})
+
+    def _tenant(self, query):
+        """The tenant this request may read: the one its bearer token belongs to.
+
+        Without tenant folders the default data/ folder is served as before;
+        admin mode may also name any tenant with ?tenant=.
+        """
+        tenants = list_tenants()
+        if not tenants:
+            return None
+        requested = query.get('tenant', [None])[0]
+        if requested is not None and admin_mode():
+            if requested not in tenants:
+                raise NotFound(f"Unknown tenant: {requested}")
+            return requested
+        scheme, _, token = self.headers.get('Authorization', '').partition(' ')
+        tenant = tenant_for_token(token.strip()) if scheme.lower() == 'bearer' else None
+        if tenant is None:
+            raise Unauthorized("A valid access token is required (Authorization: Bearer <token>)")
+        return tenant
+
+    def _not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _route(self, path, query, snapshot, precomputed):
+        """Validate path and parameters; returns a function that builds the response body"""
+        if path == '/api/students':
+            start, stop, info = paginate(query, len(snapshot.summaries))
+            return lambda: {**info, 'students': records(snapshot.summaries.frame.iloc[start:stop])}
+
+        if path == '/api/emails':
+            positions = self._email_positions(snapshot)
+            start, stop, info = paginate(query, len(positions))
+            return lambda: {**info, 'emails': [
+                {'student_id': snapshot.summaries.value('student_id', position),
+                 'emails': self._emails(snapshot, precomputed, position)}
+                for position in positions[start:stop]
+            ]}
+
+        match = STUDENT_PATH.match(path)
+        if match:
+            student_id = int(match.group(1))
+            if student_id not in snapshot.student_index:
+                raise NotFound(f"Student ID {student_id} not found")
+            position = snapshot.student_index.position(student_id)
+            if match.group(2):
+                return lambda: {'student_id': student_id, 'emails': self._emails(snapshot, precomputed, position)}
+            return lambda: {
+                # records() turns NaN trend measures into null; bare NaN is not valid JSON
+                'summary': records(snapshot.summaries.frame.iloc[position:position + 1])[0],
+                'grades': records(snapshot.grades[snapshot.grades['student_id'] == student_id]),
+                'attendance': records(snapshot.attendance[snapshot.attendance['student_id'] == student_id]),
+                'behavior': records(snapshot.behavior[snapshot.behavior['student_id'] == student_id]),
+            }
+
+        raise NotFound(f"No such endpoint: {path}")
+
+    @classmethod
+    def _email_positions(cls, snapshot):
+        """Roster positions with any email to send, computed once per snapshot with one vectorized mask"""
+        key = id(snapshot)
+        with cls._positions_lock:
+            cached = cls._positions_cache.get(key)
+            if cached is not None and cached[0]() is snapshot:
+                return cached[1]
+        masks = ThresholdExplorer(snapshot.summaries, snapshot.alerts).masks(cls.email_generator.thresholds)
+        positions = np.flatnonzero(masks['to_parent'] | masks['to_student'] | masks['to_admin'])
+        with cls._positions_lock:
+            # Only recent snapshots are worth keeping (one per tenant in practice);
+            # a weak reference never keeps a replaced snapshot in memory
+            while len(cls._positions_cache) >= MAX_CACHED_SNAPSHOTS:
+                cls._positions_cache.pop(next(iter(cls._positions_cache)))
+            cls._positions_cache[key] = (weakref.ref(snapshot), positions)
+        return positions
+
+    def _emails(self, snapshot, precomputed, position):
+        """Emails for one roster position, from the worker's warm results when ready"""
+        if precomputed is not None:
+            rendered = precomputed.emails_for(self.email_generator.teacher_name,
+                                              self.email_generator.teacher_email)
+            if rendered is not None:
+                return rendered[position]
+        return self.email_generator.generate_all_emails(
+            snapshot.summaries[position], snapshot.alerts.for_student(position))
+
+    def _send(self, status, body, etag=None, last_modified=None):
+        payload = b'' if body is None else json.dumps(body, default=to_json).encode('utf-8')
+        self.send_response(status)
+        if body is not None:
+            self.send_header('Content-Type', 'application/json')
+        if status == HTTPStatus.UNAUTHORIZED:
+            self.send_header('WWW-Authenticate', 'Bearer')
+        self.send_header('Content-Length', str(len(payload)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', format_datetime(last_modified, usegmt=True))
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host='127.0.0.1', port=8502, tenant_cache=None, quiet=False):
+    """Build (but don't start) the API server"""
+    ApiHandler.tenant_cache = tenant_cache or TenantCache()
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON API for summaries and emails")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--quiet', action='store_true', help="Don't log each request")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, quiet=args.quiet)
+    print("="*60)
+    print("🌐 Teacher Assistant API")
+    print("="*60)
+    print(f"Serving on http://{args.host}:{args.port}/api/students")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
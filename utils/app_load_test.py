@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+App Load Test
+Starts the dashboard with `streamlit run` and drives many concurrent simulated
+teacher sessions over its websocket, like browsers would, against synthetic
+rosters. Records rerun latency percentiles, server CPU time, server peak RSS
+and tenant cache hit rates per page, saved as JSON to compare releases
+
+Usage: python utils/app_load_test.py [--students 1000 20000] [--sessions 40] [--reruns 5]
+                                      [--pages Dashboard ...] [--output app_load_test.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from urllib.parse import urlencode
+
+import numpy as np
+
+# Add parent directory to path so utils can be imported when run as a script
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.synthetic_data import write_roster
+from utils.tenancy import get_tenants_dir, issue_token
+
+APP_PATH = os.path.join(PROJECT_ROOT, "app.py")
+PAGES = ["Dashboard", "Student Records", "Email Generator", "Batch Email Generation", "Data Entry"]
+CACHE_STATS = re.compile(r"Hits: (\d+), misses: (\d+)")
+DATA_READY = re.compile(r"data ready in (\d+) ms")
+
+
+class LoadTestError(Exception):
+    """Raised when the server cannot be started or a phase produced no successful reruns"""
+
+
+class ProcessSampler:
+    """Samples a process's resident memory in a background thread and keeps the peak.
+
+    Reads /proc, so CPU and memory are only reported on Linux.
+    """
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def rss(self):
+        try:
+            with open(f"/proc/{self.pid}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            return None
+
+    def cpu_seconds(self):
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                # Fields after the parenthesised command name; utime and stime are 14th and 15th
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def _sample(self):
+        current = self.rss()
+        if current is not None:
+            self.peak = max(self.peak or 0, current)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """The app under `streamlit run` on a free local port, serving data_root, stopped on exit"""
+
+    def __init__(self, data_root, startup_timeout=60):
+        self.data_root = data_root
+        self.port = free_port()
+        self.startup_timeout = startup_timeout
+        self.process = None
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", APP_PATH,
+             "--server.headless=true", f"--server.port={self.port}", "--server.address=127.0.0.1",
+             "--server.fileWatcherType=none", "--browser.gatherUsageStats=false"],
+            cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            env={**os.environ, "TAD_DATA_DIR": self.data_root},
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise LoadTestError(f"server exited: {self.process.stderr.read().decode()[-500:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as r:
+                    if r.status == 200:
+                        return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise LoadTestError(f"server did not start within {self.startup_timeout}s")
+
+    def __exit__(self, *exc):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+class Rerun:
+    """What one script run sent back: exceptions, markdown text and radio widgets"""
+
+    def __init__(self):
+        self.exceptions = []
+        self.markdown = []
+        self.radios = {}
+
+    def add(self, element):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            # The innermost frame says where in the app it was raised
+            where = element.exception.stack_trace[-1].strip() if element.exception.stack_trace else ""
+            self.exceptions.append(f"{element.exception.type}: {element.exception.message} {where}".strip())
+        elif kind == "markdown":
+            self.markdown.append(element.markdown.body)
+        elif kind == "radio":
+            self.radios[element.radio.label] = element.radio
+
+    def search(self, pattern):
+        for body in self.markdown:
+            match = pattern.search(body)
+            if match:
+                return match
+        return None
+
+    def cache_counters(self):
+        """(hits, misses) of the shared tenant cache as shown in the sidebar"""
+        match = self.search(CACHE_STATS)
+        return (int(match.group(1)), int(match.group(2))) if match else None
+
+    def data_ready_ms(self):
+        match = self.search(DATA_READY)
+        return int(match.group(1)) if match else None
+
+
+class Session:
+    """One simulated teacher: a browser tab opened with the tenant's access link"""
+
+    def __init__(self, url, token, timeout):
+        self.url = url
+        self.query_string = urlencode({"token": token})
+        self.timeout = timeout
+        self.ws = None
+        self.navigation = None
+        self.page_index = 0
+
+    async def rerun(self):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        if self.ws is None:
+            from tornado.websocket import websocket_connect
+            self.ws = await websocket_connect(self.url, max_message_size=1 << 30)
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query_string
+        if self.navigation is not None:
+            widget = msg.rerun_script.widget_states.widgets.add()
+            widget.id = self.navigation.id
+            widget.int_value = self.page_index
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+
+        rerun = Rerun()
+        while True:
+            payload = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+            if payload is None:
+                raise ConnectionError("server closed the websocket")
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                rerun.add(forward.delta.new_element)
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    rerun.exceptions.append("script failed to compile")
+                # A run that stopped early for st.rerun() is followed by the real one
+                if forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+        self.navigation = rerun.radios.get("Navigation", self.navigation)
+        return rerun
+
+    async def login(self):
+        return await self.rerun()
+
+    async def open(self, page):
+        self.page_index = list(self.navigation.options).index(page)
+        return await self.rerun()
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+
+async def run_phase(server, sessions, action, reruns):
+    """Run action(session, i) concurrently in every session, reruns times each"""
+    latencies, ready, errors, counters, messages = [], [], [], [], []
+
+    async def worker(session):
+        for i in range(reruns):
+            start = time.perf_counter()
+            try:
+                rerun = await action(session, i)
+                failed = rerun.exceptions
+            except Exception as e:
+                failed = [f"{type(e).__name__}: {e}"]
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors.append(bool(failed))
+            messages.extend(failed)
+            if failed:
+                continue
+            ms = rerun.data_ready_ms()
+            if ms is not None:
+                ready.append(ms)
+            seen = rerun.cache_counters()
+            if seen is not None:
+                counters.append(seen)
+
+    sampler = ProcessSampler(server.process.pid)
+    cpu_before = sampler.cpu_seconds()
+    with sampler:
+        start = time.perf_counter()
+        # All sessions start together, like a class period beginning
+        await asyncio.gather(*(worker(session) for session in sessions))
+        wall = time.perf_counter() - start
+    cpu_after = sampler.cpu_seconds()
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+
+    if all(errors):
+        raise LoadTestError(f"every rerun failed, e.g. {messages[0] if messages else 'unknown error'}")
+
+    latencies = np.array(latencies)
+    result = {
+        'reruns': len(latencies),
+        'errors': int(sum(errors)),
+        'error_messages': sorted(set(messages))[:5],
+        'wall_seconds': wall,
+        'reruns_per_second': len(latencies) / wall if wall else 0.0,
+        'latency_ms': {
+            'p50': float(np.percentile(latencies, 50)),
+            'p90': float(np.percentile(latencies, 90)),
+            'p99': float(np.percentile(latencies, 99)),
+            'max': float(latencies.max()),
+        },
+        'data_ready_ms': {
+            'p50': float(np.percentile(ready, 50)),
+            'p99': float(np.percentile(ready, 99)),
+        } if ready else None,
+        'server_cpu_seconds': cpu,
+        'server_cpu_ms_per_rerun': cpu * 1000 / len(latencies) if cpu is not None else None,
+        'server_peak_rss_mb': sampler.peak / 1024 / 1024 if sampler.peak is not None else None,
+    }
+    # Counters are server-wide and only grow, so the largest seen is the latest
+    return result, (max(counters) if counters else None)
+
+
+def cache_delta(before, after):
+    if before is None or after is None:
+        return None
+    hits, misses = after[0] - before[0], after[1] - before[1]
+    lookups = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / lookups if lookups else None}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def drive_sessions(server, token, args):
+    """Log every session in, then open each page and rerun it; returns results per phase"""
+    sessions = [Session(server.url, token, args.timeout) for _ in range(args.sessions)]
+    try:
+        phases = {}
+        # The first login pays the cold load of the roster
+        result, counters = await run_phase(server, sessions, lambda session, i: session.login(), 1)
+        phases['login'] = result
+        print_phase('login', result)
+        for page in args.pages:
+            result, after = await run_phase(
+                server, sessions,
+                lambda session, i, page=page: session.open(page) if i == 0 else session.rerun(),
+                args.reruns
+            )
+            result['tenant_cache'] = cache_delta(counters, after)
+            counters = after or counters
+            phases[page] = result
+            print_phase(page, result)
+        return phases
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def load_test_roster(n_students, args):
+    """Write a synthetic roster as a tenant, serve it from a fresh server and drive sessions against it"""
+    tenant = f"loadtest-{n_students}"
+    tenant_dir = os.path.join(get_tenants_dir(), tenant)
+    write_roster(tenant_dir, n_students, seed=args.seed)
+    token = issue_token(tenant)
+    try:
+        # A fresh server per roster keeps earlier rosters out of its memory and cache counters
+        with AppServer(os.environ["TAD_DATA_DIR"]) as server:
+            phases = asyncio.run(drive_sessions(server, token, args))
+        return {'students': n_students, 'pages': phases}
+    finally:
+        shutil.rmtree(tenant_dir, ignore_errors=True)
+
+
+def print_phase(name, result):
+    latency = result['latency_ms']
+    cache = result.get('tenant_cache')
+    cpu = result['server_cpu_ms_per_rerun']
+    rss = result['server_peak_rss_mb']
+    hit_rate = f", cache hit rate {cache['hit_rate']:.0%}" if cache and cache['hit_rate'] is not None else ""
+    print(f"  {name:24s} p50 {latency['p50']:7.0f} ms  p99 {latency['p99']:7.0f} ms"
+          + (f"  CPU {cpu:6.0f} ms/rerun" if cpu is not None else "")
+          + (f"  RSS {rss:6.0f} MB" if rss is not None else "")
+          + hit_rate + (f"  ❌ {result['errors']} errors" if result['errors'] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit app with concurrent simulated sessions")
+    parser.add_argument('--students', type=int, nargs='+', default=[1000], help="Roster sizes to test")
+    parser.add_argument('--sessions', type=int, default=40, help="Concurrent sessions")
+    parser.add_argument('--reruns', type=int, default=5, help="Reruns per session per page")
+    parser.add_argument('--pages', nargs='+', choices=PAGES, default=PAGES)
+    parser.add_argument('--timeout', type=float, default=120, help="Seconds allowed per rerun")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='app_load_test.json')
+    args = parser.parse_args()
+
+    try:
+        import streamlit
+    except ImportError:
+        print("❌ Streamlit is required: pip install -r requirements.txt")
+        sys.exit(1)
+
+    print("="*60)
+    print("🚦 App Load Test")
+    print("="*60)
+    print(f"{args.sessions} sessions x {args.reruns} reruns per page, rosters: {args.students}")
+
+    # Rosters, access tokens and history live in a scratch data root, never in the
+    # checkout's data/, so an app running there is unaffected
+    data_root = tempfile.mkdtemp(prefix="app_load_test-")
+    os.environ["TAD_DATA_DIR"] = data_root
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'streamlit': streamlit.__version__,
+        'cpu_count': os.cpu_count(),
+        'sessions': args.sessions,
+        'reruns': args.reruns,
+        'rosters': [],
+    }
+    try:
+        for n_students in args.students:
+            print(f"\n👥 {n_students} students")
+            results['rosters'].append(load_test_roster(n_students, args))
+    except LoadTestError as e:
+        print(f"❌ Load test failed: {e}")
+        sys.exit(1)
+    finally:
+        shutil.rmtree(data_root, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {args.output}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Dense student-by-school-day attendance matrix.
+"""
+import numpy as np
+import pandas as pd
+
+# One code per attendance status; NO_RECORD marks days without a row
+NO_RECORD = 0
+STATUS_CODES = {'present': 1, 'absent': 2, 'tardy': 3, 'excused': 4}
+
+# Share of recorded days missed (absent or excused) that counts as chronic absence
+CHRONIC_ABSENCE_THRESHOLD = 0.10
+
+
+def _run_lengths(mask: np.ndarray) -> np.ndarray:
+    """Length of the run of True ending at each cell, along each row."""
+    counts = np.cumsum(mask, axis=1, dtype=np.int32)
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=1)
+    return counts - resets
+
+
+class AttendanceMatrix:
+    """Attendance codes for every student on every school day.
+
+    ``codes[i, j]`` is the status code of ``student_ids[i]`` on ``days[j]``,
+    one byte per student-day. The day calendar is every date that has at
+    least one attendance record.
+    """
+
+    def __init__(self, student_ids: np.ndarray, days: pd.DatetimeIndex, codes: np.ndarray):
+        self.student_ids = student_ids
+        self.days = days
+        self.codes = codes
+
+    @classmethod
+    def from_frame(cls, attendance_df: pd.DataFrame, student_ids) -> 'AttendanceMatrix':
+        """Build from long-form attendance rows for the given roster.
+
+        Rows for students outside the roster or with unknown statuses are
+        ignored; for duplicate (student, date) rows the last one wins.
+        """
+        student_ids = np.asarray(student_ids)
+        days = pd.DatetimeIndex(attendance_df['date'].drop_duplicates()).sort_values()
+        matrix = cls(student_ids, days, np.zeros((len(student_ids), len(days)), dtype=np.uint8))
+        matrix._fill(attendance_df)
+        return matrix
+
+    def with_rows(self, attendance_df: pd.DataFrame) -> 'AttendanceMatrix':
+        """Copy with extra attendance rows applied, adding any new days.
+
+        The result matches ``from_frame`` on the concatenated rows; this
+        matrix is left untouched for readers still holding it.
+        """
+        days = self.days.union(pd.DatetimeIndex(attendance_df['date'].dropna().unique()))
+        if len(days) == len(self.days):
+            codes = self.codes.copy()
+        else:
+            codes = np.zeros((len(self.student_ids), len(days)), dtype=np.uint8)
+            codes[:, days.get_indexer(self.days)] = self.codes
+        matrix = AttendanceMatrix(self.student_ids, days, codes)
+        matrix._fill(attendance_df)
+        return matrix
+
+    def _fill(self, attendance_df: pd.DataFrame):
+        rows = pd.Index(self.student_ids).get_indexer(attendance_df['student_id'])
+        cols = self.days.get_indexer(attendance_df['date'])
+        values = attendance_df['status'].map(STATUS_CODES).fillna(NO_RECORD).to_numpy(np.uint8)
+        keep = (rows >= 0) & (cols >= 0) & (values != NO_RECORD)
+        self.codes[rows[keep], cols[keep]] = values[keep]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+    def count(self, status: str) -> np.ndarray:
+        """Days per student with the given status."""
+        return (self.codes == STATUS_CODES[status]).sum(axis=1)
+
+    def recorded_days(self) -> np.ndarray:
+        return (self.codes != NO_RECORD).sum(axis=1)
+
+    def absence_streaks(self):
+        """(longest, current) runs of consecutive missed days per student.
+
+        Absent and excused days both count as missed; days without a record
+        break a streak.
+        """
+        missed = (self.codes == STATUS_CODES['absent']) | (self.codes == STATUS_CODES['excused'])
+        if missed.shape[1] == 0:
+            empty = np.zeros(len(self.student_ids), dtype=np.int32)
+            return empty, empty
+        runs = _run_lengths(missed)
+        return runs.max(axis=1), runs[:, -1]
+
+    def metrics(self) -> pd.DataFrame:
+        """Attendance metrics for the whole roster, one row per student.
+
+        Rates are percentages of recorded days. ``attendance_rate`` counts
+        only ``present`` days; students with no records get 100.0 and 0.0
+        for the other rates.
+        """
+        recorded = self.recorded_days()
+        denominator = np.maximum(recorded, 1)
+        has_records = recorded > 0
+
+        def rate(status, default):
+            return np.where(has_records, self.count(status) / denominator * 100, default)
+
+        missed = self.count('absent') + self.count('excused')
+        longest, current = self.absence_streaks()
+        return pd.DataFrame({
+            'student_id': self.student_ids,
+            'attendance_rate': rate('present', 100.0),
+            'tardy_rate': rate('tardy', 0.0),
+            'excused_rate': rate('excused', 0.0),
+            'absence_rate': np.where(has_records, missed / denominator * 100, 0.0),
+            'longest_absence_streak': longest.astype(np.int16),
+            'current_absence_streak': current.astype(np.int16),
+            'chronic_absence': has_records & (missed / denominator >= CHRONIC_ABSENCE_THRESHOLD),
+        })
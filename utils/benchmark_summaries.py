@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Summary Representation Benchmark
+Compares memory and pickle round-trip cost of list-of-dict summaries
+against the columnar SummaryTable
+
+Usage: python -m utils.benchmark_summaries [n_students ...]
+"""
+
+import pickle
+import sys
+import time
+import tracemalloc
+
+from utils.summary_table import SummaryTable
+from utils.synthetic_data import generate_roster
+
+
+def measure_memory(obj):
+    """Bytes retained by a self-contained copy of obj (unpickled, so no shared strings)."""
+    payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    tracemalloc.start()
+    copy = pickle.loads(payload)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copy
+    return retained
+
+
+def measure_round_trip(obj, repeat=3):
+    """Best (seconds, pickled bytes) of pickling and unpickling obj."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.loads(payload)
+        best = min(best, time.perf_counter() - start)
+    return best, len(payload)
+
+
+def benchmark(n_students):
+    frames = generate_roster(n_students, n_assignments=10, n_days=20)
+
+    table = SummaryTable.from_frames(*frames)
+    records = [dict(row) for row in table]
+
+    records_bytes = measure_memory(records)
+    table_bytes = measure_memory(table)
+
+    records_time, records_size = measure_round_trip(records)
+    table_time, table_size = measure_round_trip(table)
+
+    print(f"\n{n_students} students")
+    print(f"  {'':<16}{'memory':>12}{'pickled':>12}{'round trip':>14}")
+    print(f"  {'list of dicts':<16}{records_bytes / 1e6:>10.1f}MB{records_size / 1e6:>10.1f}MB"
+          f"{records_time * 1e3:>12.1f}ms")
+    print(f"  {'SummaryTable':<16}{table_bytes / 1e6:>10.1f}MB{table_size / 1e6:>10.1f}MB"
+          f"{table_time * 1e3:>12.1f}ms")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    print("="*60)
+    print("📊 Summary Representation Benchmark")
+    print("="*60)
+    for n_students in sizes:
+        benchmark(n_students)
+
+
+if __name__ == "__main__":
+    main()
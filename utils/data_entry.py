@@ -0,0 +1,171 @@
+"""
+Append-only writes for attendance and behavior entered in the app.
+
+New rows are added to the end of the existing CSV files, which are never
+rewritten. Submissions from concurrent sessions wait in a small
+write-ahead buffer and are flushed together. Each flush does one locked
+append and one fsync per file (group commit). A submit returns once its
+own rows are on disk, so a whole class roll is a single atomic append.
+"""
+import io
+import os
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.attendance_matrix import STATUS_CODES
+from utils.data_loader import get_data_path
+
+try:
+    import fcntl
+except ImportError:  # Windows: only writers in this process are serialized
+    fcntl = None
+
+ATTENDANCE_COLUMNS = ['student_id', 'date', 'status', 'notes']
+BEHAVIOR_COLUMNS = ['student_id', 'date', 'incident_type', 'severity', 'description']
+INCIDENT_TYPES = ['positive', 'disruption']
+SEVERITIES = ['low', 'medium', 'high']
+
+
+def attendance_rows(student_ids: Iterable[int], day: date, statuses: Iterable[str],
+                    notes: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Roll for one day as attendance rows, typed like load_attendance_data()."""
+    rows = pd.DataFrame({'student_id': list(student_ids), 'status': list(statuses)})
+    unknown = sorted(set(rows['status']) - set(STATUS_CODES))
+    if unknown:
+        raise ValueError(f"Unknown attendance status: {', '.join(map(str, unknown))}")
+    if rows['student_id'].duplicated().any():
+        raise ValueError("Each student can only appear once in a roll")
+    rows['student_id'] = rows['student_id'].astype('int64')
+    rows['date'] = pd.Timestamp(day)
+    notes = list(notes) if notes is not None else [None] * len(rows)
+    rows['notes'] = [note.strip() if isinstance(note, str) and note.strip() else None for note in notes]
+    return rows[ATTENDANCE_COLUMNS]
+
+
+def behavior_rows(student_id: int, day: date, incident_type: str, severity: str,
+                  description: str) -> pd.DataFrame:
+    """One behavior incident as a row, typed like load_behavior_data()."""
+    if incident_type not in INCIDENT_TYPES:
+        raise ValueError(f"Incident type must be one of {INCIDENT_TYPES}")
+    if severity not in SEVERITIES:
+        raise ValueError(f"Severity must be one of {SEVERITIES}")
+    if not description.strip():
+        raise ValueError("Please describe the incident")
+    return pd.DataFrame({
+        'student_id': [int(student_id)],
+        'date': [pd.Timestamp(day)],
+        'incident_type': [incident_type],
+        'severity': [severity],
+        'description': [description.strip()],
+    })
+
+
+def to_csv_bytes(rows: pd.DataFrame, columns: List[str]) -> bytes:
+    """Rows encoded exactly as they will be appended, without a header."""
+    out = io.StringIO()
+    rows[columns].to_csv(out, index=False, header=False, date_format='%Y-%m-%d', lineterminator='\n')
+    return out.getvalue().encode('utf-8')
+
+
+def append_locked(path: str, payload: bytes) -> Tuple[int, int, int]:
+    """Append payload to an existing file under an exclusive lock and fsync it.
+
+    Returns (size_before, mtime_ns, size_after) as seen while the lock was held.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_APPEND)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)  # released on close
+        size_before = os.fstat(fd).st_size
+        if size_before:
+            os.lseek(fd, -1, os.SEEK_END)
+            if os.read(fd, 1) != b'\n':
+                payload = b'\n' + payload
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+        stat = os.fstat(fd)
+        return size_before, stat.st_mtime_ns, stat.st_size
+    finally:
+        os.close(fd)
+
+
+class AppendWriter:
+    """Group-commit writer for the CSV files in one data directory."""
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.data_dir = data_dir
+        self.batches = 0
+        self.rows_written = 0
+        self._pending: List[Tuple[int, str, bytes, int]] = []
+        self._submitted = 0
+        self._flushed = 0
+        self._failed: Dict[int, Exception] = {}
+        # file -> {size before an append: (mtime_ns, size) after it}
+        self._history: Dict[str, Dict[int, Tuple[int, int]]] = {}
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def submit(self, filename: str, rows: pd.DataFrame, columns: List[str]):
+        """Append rows to a data file; returns once they are durable.
+
+        Raises OSError if the batch holding these rows could not be written.
+        """
+        if rows.empty:
+            return
+        payload = to_csv_bytes(rows, columns)
+        with self._buffer_lock:
+            self._submitted += 1
+            ticket = self._submitted
+            self._pending.append((ticket, filename, payload, len(rows)))
+
+        with self._flush_lock:
+            if ticket > self._flushed:
+                # Whoever flushed before us only took what was buffered then
+                self._flush()
+            if ticket in self._failed:
+                raise self._failed.pop(ticket)
+
+    def _flush(self):
+        with self._buffer_lock:
+            batch, self._pending = self._pending, []
+            last_ticket = self._submitted
+
+        by_file: Dict[str, list] = {}
+        for entry in batch:
+            by_file.setdefault(entry[1], []).append(entry)
+        for filename, entries in by_file.items():
+            try:
+                size_before, mtime_ns, size_after = append_locked(
+                    get_data_path(filename, self.data_dir), b''.join(entry[2] for entry in entries)
+                )
+            except OSError as e:
+                for entry in entries:
+                    self._failed[entry[0]] = e
+                continue
+            self._history.setdefault(filename, {})[size_before] = (mtime_ns, size_after)
+            self.rows_written += sum(entry[3] for entry in entries)
+
+        self._flushed = last_ticket
+        self.batches += 1
+
+    def explains(self, old_fingerprint: Tuple, new_fingerprint: Tuple) -> bool:
+        """True if every difference between two data_fingerprint() results is our own appends."""
+        old = {name: (mtime_ns, size) for name, mtime_ns, size in old_fingerprint}
+        new = {name: (mtime_ns, size) for name, mtime_ns, size in new_fingerprint}
+        if old.keys() != new.keys():
+            return False
+        for name in old:
+            if old[name] == new[name]:
+                continue
+            history = self._history.get(name, {})
+            state = old[name]
+            while state != new[name] and state[1] in history:
+                state = history[state[1]]
+            if state != new[name]:
+                return False
+        return True
@@ -3,49 +3,86 @@ Data loader utilities for student records.
 """
 import pandas as pd
 import os
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 
-def get_data_path(filename: str) -> str:
-    """Get the full path to a data file."""
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(current_dir)
-    return os.path.join(project_root, "data", filename)
+def get_data_path(filename: str, data_dir: Optional[str] = None) -> str:
+    """Get the full path to a data file.
 
+    The default folder is the project's data/, or TAD_DATA_DIR when that
+    environment variable is set.
+    """
+    if data_dir is None:
+        data_dir = os.environ.get("TAD_DATA_DIR") or None
+    if data_dir is None:
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.dirname(current_dir)
+        data_dir = os.path.join(project_root, "data")
+    return os.path.join(data_dir, filename)
 
-def load_student_data() -> pd.DataFrame:
+
+def load_student_data(data_dir: Optional[str] = None) -> pd.DataFrame:
     """Load student information."""
-    return pd.read_csv(get_data_path("students.csv"))
+    return pd.read_csv(get_data_path("students.csv", data_dir))
 
 
-def load_grades_data() -> pd.DataFrame:
+def load_grades_data(data_dir: Optional[str] = None) -> pd.DataFrame:
     """Load grades data."""
-    df = pd.read_csv(get_data_path("grades.csv"))
+    df = pd.read_csv(get_data_path("grades.csv", data_dir))
     df['date'] = pd.to_datetime(df['date'])
     return df
 
 
-def load_attendance_data() -> pd.DataFrame:
-    """Load attendance data."""
-    df = pd.read_csv(get_data_path("attendance.csv"))
+def load_attendance_data(data_dir: Optional[str] = None) -> pd.DataFrame:
+    """Load attendance data (the last entry per student and date)."""
+    df = pd.read_csv(get_data_path("attendance.csv", data_dir))
     df['date'] = pd.to_datetime(df['date'])
+    return latest_attendance(df)
+
+
+def latest_attendance(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep only the last row per (student_id, date).
+
+    Re-taking roll appends new rows rather than rewriting the file, so a
+    later entry replaces an earlier one for the same student and day.
+    """
+    replaced = df.duplicated(['student_id', 'date'], keep='last')
+    if replaced.any():
+        df = df[~replaced].reset_index(drop=True)
     return df
 
 
-def load_behavior_data() -> pd.DataFrame:
+def load_behavior_data(data_dir: Optional[str] = None) -> pd.DataFrame:
     """Load behavior data."""
-    df = pd.read_csv(get_data_path("behavior.csv"))
+    df = pd.read_csv(get_data_path("behavior.csv", data_dir))
     df['date'] = pd.to_datetime(df['date'])
     return df
 
 
-def load_all_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def frame_nbytes(df: pd.DataFrame, sample_rows: int = 10_000) -> int:
+    """Approximate bytes held by a DataFrame, cheap enough to call on every request.
+
+    Numeric columns are counted exactly; text columns are measured deeply on
+    an evenly spaced sample of rows and scaled up.
+    """
+    shallow = df.memory_usage(index=True, deep=False)
+    total = int(shallow.sum())
+    step = max(1, len(df) // sample_rows)
+    for column in df.columns:
+        if df[column].dtype == object or isinstance(df[column].dtype, pd.StringDtype):
+            sample = df[column].iloc[::step]
+            deep = int(sample.memory_usage(index=False, deep=True)) * len(df) // max(len(sample), 1)
+            total += deep - int(shallow[column])
+    return total
+
+
+def load_all_data(data_dir: Optional[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """Load all data at once."""
     return (
-        load_student_data(),
-        load_grades_data(),
-        load_attendance_data(),
-        load_behavior_data()
+        load_student_data(data_dir),
+        load_grades_data(data_dir),
+        load_attendance_data(data_dir),
+        load_behavior_data(data_dir)
     )
 
 
@@ -80,15 +117,10 @@ def count_behavior_incidents(behavior_df: pd.DataFrame, student_id: int, inciden
     return len(student_behavior)
 
 
-def get_student_summary(student_id: int) -> Dict:
-    """Get a comprehensive summary for a student."""
-    students_df, grades_df, attendance_df, behavior_df = load_all_data()
-    
-    student_rows = students_df[students_df['student_id'] == student_id]
-    if len(student_rows) == 0:
-        raise ValueError(f"Student ID {student_id} not found")
-    student = student_rows.iloc[0]
-    
+def summarize_student(student: pd.Series, grades_df: pd.DataFrame, attendance_df: pd.DataFrame,
+                      behavior_df: pd.DataFrame) -> Dict:
+    """Build the summary dict for one student row from already-loaded data."""
+    student_id = student['student_id']
     return {
         'student_id': student_id,
         'name': student['name'],
@@ -101,3 +133,15 @@ def get_student_summary(student_id: int) -> Dict:
         'positive_incidents': count_behavior_incidents(behavior_df, student_id, 'positive'),
         'negative_incidents': count_behavior_incidents(behavior_df, student_id, 'disruption'),
     }
+
+
+def get_student_summary(student_id: int) -> Dict:
+    """Get a comprehensive summary for a student."""
+    students_df, grades_df, attendance_df, behavior_df = load_all_data()
+    
+    student_rows = students_df[students_df['student_id'] == student_id]
+    if len(student_rows) == 0:
+        raise ValueError(f"Student ID {student_id} not found")
+    student = student_rows.iloc[0]
+    
+    return summarize_student(student, grades_df, attendance_df, behavior_df)
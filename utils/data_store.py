@@ -0,0 +1,410 @@
+"""
+Process-wide shared data store.
+
+All Streamlit sessions read the same immutable snapshot of the loaded
+frames, search index and summaries. A reload builds a complete new
+snapshot off to the side and then swaps a single reference, so readers
+never block and never see a half-built state (read-copy-update).
+
+Derived artifacts (summaries, search index, alerts, cubes) are built lazily
+per snapshot, so each page waits only for what it reads; the rest can be
+prefetched in the background.
+
+Rows entered in the app are appended to the CSV files and folded into a
+new snapshot incrementally, recomputing only the affected students.
+"""
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.alert_rules import (
+    AlertResults, FeatureFrame, RuleError, evaluate_rules, find_rules_file, load_alert_rules
+)
+from utils.analytics_cubes import AnalyticsCubes
+from utils.attendance_matrix import AttendanceMatrix
+from utils.data_entry import ATTENDANCE_COLUMNS, BEHAVIOR_COLUMNS, AppendWriter
+from utils.data_loader import frame_nbytes, get_data_path, latest_attendance, load_all_data
+from utils.student_index import StudentSearchIndex
+from utils.summary_table import ATTENDANCE_SUMMARY_COLUMNS, SummaryRow, SummaryTable, incident_counts
+
+
+def _build_attendance_matrix(snapshot: 'DataSnapshot') -> AttendanceMatrix:
+    return AttendanceMatrix.from_frame(snapshot.attendance, snapshot.students['student_id'])
+
+
+def _build_summaries(snapshot: 'DataSnapshot') -> SummaryTable:
+    return SummaryTable.from_frames(snapshot.students, snapshot.grades, snapshot.attendance,
+                                    snapshot.behavior, snapshot.attendance_matrix)
+
+
+def _build_student_index(snapshot: 'DataSnapshot') -> StudentSearchIndex:
+    return StudentSearchIndex(snapshot.students)
+
+
+def _build_alerts(snapshot: 'DataSnapshot') -> AlertResults:
+    try:
+        rules = load_alert_rules(snapshot.rules_file) if snapshot.rules_file else []
+        features = FeatureFrame(snapshot.summaries, snapshot.grades, snapshot.attendance_matrix, snapshot.behavior)
+        return evaluate_rules(rules, features)
+    except RuleError as e:
+        return AlertResults.empty(len(snapshot.summaries), error=str(e))
+
+
+def _build_cubes(snapshot: 'DataSnapshot') -> AnalyticsCubes:
+    return AnalyticsCubes.build(snapshot.grades, snapshot.attendance_matrix, snapshot.behavior)
+
+
+# Derived artifacts, built from the snapshot's frames the first time they are needed
+ARTIFACT_BUILDERS = {
+    'attendance_matrix': _build_attendance_matrix,
+    'summaries': _build_summaries,
+    'student_index': _build_student_index,
+    'alerts': _build_alerts,
+    'cubes': _build_cubes,
+}
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """One consistent, read-only view of all loaded data.
+
+    The four frames are read together when the snapshot is built. Derived
+    artifacts (see ARTIFACT_BUILDERS) are computed on first use, at most
+    once per snapshot, so a page only waits for what it reads. Frames are
+    shared by every session; callers must copy before mutating.
+    """
+    version: int
+    loaded_at: datetime
+    students: pd.DataFrame
+    grades: pd.DataFrame
+    attendance: pd.DataFrame
+    behavior: pd.DataFrame
+    rules_file: Optional[str] = None
+    # Problems found while loading that the app should show, e.g. duplicated student IDs
+    warnings: Tuple[str, ...] = ()
+    # Artifacts already built, e.g. carried over from the previous snapshot
+    artifacts: Dict[str, object] = field(default_factory=dict, repr=False)
+    _locks: Dict[str, threading.Lock] = field(
+        default_factory=lambda: {name: threading.Lock() for name in ARTIFACT_BUILDERS},
+        init=False, repr=False, compare=False
+    )
+
+    def _artifact(self, name: str):
+        artifact = self.artifacts.get(name)
+        if artifact is None:
+            # Sessions asking for the same artifact wait for a single build
+            with self._locks[name]:
+                artifact = self.artifacts.get(name)
+                if artifact is None:
+                    artifact = ARTIFACT_BUILDERS[name](self)
+                    self.artifacts[name] = artifact
+        return artifact
+
+    def require(self, *names: str) -> 'DataSnapshot':
+        """Build the named artifacts now (in dependency order as needed)."""
+        for name in names:
+            self._artifact(name)
+        return self
+
+    @property
+    def built(self) -> Tuple[str, ...]:
+        """Names of the artifacts built so far."""
+        return tuple(name for name in ARTIFACT_BUILDERS if name in self.artifacts)
+
+    @property
+    def attendance_matrix(self) -> AttendanceMatrix:
+        return self._artifact('attendance_matrix')
+
+    @property
+    def summaries(self) -> SummaryTable:
+        return self._artifact('summaries')
+
+    @property
+    def student_index(self) -> StudentSearchIndex:
+        return self._artifact('student_index')
+
+    @property
+    def alerts(self) -> AlertResults:
+        return self._artifact('alerts')
+
+    @property
+    def cubes(self) -> AnalyticsCubes:
+        return self._artifact('cubes')
+
+    def summary(self, student_id: int) -> SummaryRow:
+        """Cached summary for one student."""
+        if student_id not in self.student_index:
+            raise ValueError(f"Student ID {student_id} not found")
+        return self.summaries[self.student_index.position(student_id)]
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the frames and the artifacts built so far (sampled, so cheap)."""
+        frames = (self.students, self.grades, self.attendance, self.behavior)
+        total = sum(frame_nbytes(df) for df in frames)
+        artifacts = self.artifacts
+        if 'summaries' in artifacts:
+            total += artifacts['summaries'].memory_usage()
+        for name in ('attendance_matrix', 'student_index', 'alerts', 'cubes'):
+            if name in artifacts:
+                total += artifacts[name].nbytes
+        return total
+
+
+@dataclass(frozen=True)
+class PrecomputedResults:
+    """Send flags and rendered emails derived from one snapshot version.
+
+    ``send_flags`` is aligned with ``DataSnapshot.summaries``. ``emails`` maps
+    a (teacher_name, teacher_email) profile to one dict of generated emails
+    per summary (empty when nothing needs sending).
+    """
+    version: int
+    computed_at: datetime
+    send_flags: List[Dict[str, bool]]
+    emails: Dict[Tuple[str, str], List[Dict[str, Dict]]]
+
+    def emails_for(self, teacher_name: str, teacher_email: str) -> Optional[List[Dict[str, Dict]]]:
+        """Rendered emails for a teacher profile, or None if not precomputed."""
+        return self.emails.get((teacher_name, teacher_email))
+
+    def memory_usage(self, sample_size: int = 200) -> int:
+        """Approximate bytes held by the flags and rendered emails, measured on a sample of students."""
+        total = _sampled_size(self.send_flags, sample_size)
+        for rendered in self.emails.values():
+            total += _sampled_size(rendered, sample_size)
+        return total
+
+
+def _deep_size(obj) -> int:
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_deep_size(key) + _deep_size(value) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(_deep_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+def _sampled_size(items: list, sample_size: int) -> int:
+    if not items:
+        return sys.getsizeof(items)
+    sample = items[::max(1, len(items) // sample_size)]
+    return sys.getsizeof(items) + sum(_deep_size(item) for item in sample) * len(items) // len(sample)
+
+
+def build_snapshot(version: int, data_dir: Optional[str] = None) -> DataSnapshot:
+    """Load all four data files; derived artifacts are built when first used."""
+    students_df, grades_df, attendance_df, behavior_df = load_all_data(data_dir)
+    warnings = ()
+    # Every derived artifact indexes students by ID, so the roster must be unique
+    duplicated = students_df.duplicated('student_id', keep='last')
+    if duplicated.any():
+        ids = students_df.loc[duplicated, 'student_id'].unique()
+        students_df = students_df[~duplicated].reset_index(drop=True)
+        warnings = (f"students.csv lists {len(ids)} student ID(s) more than once (e.g. {ids[0]}); "
+                    f"the last row of each is used",)
+    return DataSnapshot(
+        version=version,
+        loaded_at=datetime.now(),
+        students=students_df,
+        grades=grades_df,
+        attendance=attendance_df,
+        behavior=behavior_df,
+        rules_file=find_rules_file(os.path.dirname(get_data_path("students.csv", data_dir))),
+        warnings=warnings,
+    )
+
+
+def _concat(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    # Matching dtypes first keeps concat a plain copy instead of re-casting the whole
+    # frame; a column that was all blank (float NaN) simply becomes object
+    rows = rows[list(df.columns)].copy()
+    for column, dtype in df.dtypes.items():
+        try:
+            rows[column] = rows[column].astype(dtype)
+        except (TypeError, ValueError):
+            pass
+    return pd.concat([df, rows], ignore_index=True)
+
+
+def _without_entries(attendance_df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """attendance_df minus the rows replaced by rows' (student_id, date) entries.
+
+    Same result as ``latest_attendance`` on the concatenation, but only the few
+    candidate rows are compared pairwise.
+    """
+    candidates = attendance_df['student_id'].isin(rows['student_id']) & attendance_df['date'].isin(rows['date'])
+    if not candidates.any():
+        return attendance_df
+    keys = pd.MultiIndex.from_frame(rows[['student_id', 'date']])
+    replaced = candidates.copy()
+    replaced[candidates] = pd.MultiIndex.from_frame(attendance_df.loc[candidates, ['student_id', 'date']]).isin(keys)
+    return attendance_df[~replaced].reset_index(drop=True)
+
+
+def apply_appended(snapshot: DataSnapshot, version: int, attendance: Optional[pd.DataFrame] = None,
+                   behavior: Optional[pd.DataFrame] = None) -> DataSnapshot:
+    """New snapshot with appended rows folded in.
+
+    Summaries are recomputed only for the students in the new rows, so the
+    result matches ``build_snapshot`` on the files without re-reading them.
+    """
+    student_ids = pd.Index(snapshot.summaries.column('student_id'))
+    attendance_df, behavior_df = snapshot.attendance, snapshot.behavior
+    attendance_matrix, summaries = snapshot.attendance_matrix, snapshot.summaries
+
+    if attendance is not None and not attendance.empty:
+        attendance = latest_attendance(attendance)
+        attendance_df = _concat(_without_entries(attendance_df, attendance), attendance)
+        attendance_matrix = attendance_matrix.with_rows(attendance)
+        positions = np.unique(student_ids.get_indexer(attendance['student_id']))
+        positions = positions[positions >= 0]
+        old_days = snapshot.attendance_matrix.days
+        new_days = attendance_matrix.days.difference(old_days)
+        if len(new_days) and len(old_days) and new_days.min() < old_days.max():
+            # A backdated day without records for other students splits their streaks
+            positions = np.arange(len(student_ids))
+        metrics = AttendanceMatrix(
+            attendance_matrix.student_ids[positions], attendance_matrix.days, attendance_matrix.codes[positions]
+        ).metrics()
+        summaries = summaries.with_updates(
+            positions, {column: metrics[column].to_numpy() for column in ATTENDANCE_SUMMARY_COLUMNS}
+        )
+
+    if behavior is not None and not behavior.empty:
+        behavior_df = _concat(behavior_df, behavior)
+        positions = np.unique(student_ids.get_indexer(behavior['student_id']))
+        positions = positions[positions >= 0]
+        added = incident_counts(behavior, student_ids[positions])
+        summaries = summaries.with_updates(
+            positions, {column: summaries.column(column)[positions] + counts for column, counts in added.items()}
+        )
+
+    # Artifacts nobody has used yet stay lazy in the new snapshot too
+    artifacts = {'attendance_matrix': attendance_matrix, 'summaries': summaries}
+    if 'student_index' in snapshot.artifacts:
+        artifacts['student_index'] = snapshot.student_index
+    if 'alerts' in snapshot.artifacts:
+        alerts = snapshot.alerts
+        if alerts.error is None:
+            try:
+                features = FeatureFrame(summaries, snapshot.grades, attendance_matrix, behavior_df)
+                alerts = evaluate_rules(alerts.rules, features)
+            except RuleError as e:
+                alerts = AlertResults.empty(len(summaries), error=str(e))
+        artifacts['alerts'] = alerts
+    if 'cubes' in snapshot.artifacts:
+        artifacts['cubes'] = snapshot.cubes.with_appended(attendance_matrix, behavior)
+
+    return DataSnapshot(
+        version=version,
+        loaded_at=datetime.now(),
+        students=snapshot.students,
+        grades=snapshot.grades,
+        attendance=attendance_df,
+        behavior=behavior_df,
+        rules_file=snapshot.rules_file,
+        warnings=snapshot.warnings,
+        artifacts=artifacts,
+    )
+
+
+class DataStore:
+    """Holder for the current snapshot, swapped atomically on reload."""
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.data_dir = data_dir
+        self._snapshot: Optional[DataSnapshot] = None
+        self._precomputed: Optional[PrecomputedResults] = None
+        self._reload_lock = threading.Lock()
+        # Appends write concurrently (so the writer can batch them) but never overlap a reload
+        self._writers = 0
+        self._no_writers = threading.Condition(self._reload_lock)
+        self.writer = AppendWriter(data_dir)
+
+    @property
+    def snapshot(self) -> DataSnapshot:
+        """Current snapshot. Only the very first access waits for a load."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._load_initial()
+        return snapshot
+
+    @property
+    def version(self) -> int:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else 0
+
+    def _load_initial(self) -> DataSnapshot:
+        with self._reload_lock:
+            if self._snapshot is None:
+                self._snapshot = build_snapshot(version=1, data_dir=self.data_dir)
+            return self._snapshot
+
+    def reload(self) -> DataSnapshot:
+        """Build a fresh snapshot and publish it.
+
+        Concurrent reloads are serialized; readers keep using the previous
+        snapshot until the reference is replaced.
+        """
+        with self._reload_lock:
+            while self._writers:
+                self._no_writers.wait()
+            snapshot = build_snapshot(version=self.version + 1, data_dir=self.data_dir)
+            self._snapshot = snapshot
+            return snapshot
+
+    def append(self, attendance: Optional[pd.DataFrame] = None,
+               behavior: Optional[pd.DataFrame] = None) -> DataSnapshot:
+        """Append entered rows to the data files and publish them without a reload.
+
+        Rows should come from ``data_entry.attendance_rows`` / ``behavior_rows``.
+        Raises OSError (and publishes nothing) if the rows could not be written.
+        """
+        self.snapshot  # appends build on a loaded snapshot
+        with self._reload_lock:
+            self._writers += 1
+        written = False
+        try:
+            if attendance is not None:
+                self.writer.submit("attendance.csv", attendance, ATTENDANCE_COLUMNS)
+            if behavior is not None:
+                self.writer.submit("behavior.csv", behavior, BEHAVIOR_COLUMNS)
+            written = True
+        finally:
+            with self._reload_lock:
+                self._writers -= 1
+                self._no_writers.notify_all()
+                if written:
+                    self._snapshot = apply_appended(self._snapshot, self.version + 1, attendance, behavior)
+        return self._snapshot
+
+    def prefetch(self, names) -> Optional[threading.Thread]:
+        """Build artifacts of the current snapshot in a background thread.
+
+        Returns the thread, or None when they are all built already.
+        """
+        snapshot = self.snapshot
+        missing = [name for name in names if name not in snapshot.artifacts]
+        if not missing:
+            return None
+        thread = threading.Thread(target=snapshot.require, args=missing, name="artifact-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def precomputed(self) -> Optional[PrecomputedResults]:
+        """Warm results for the current snapshot, or None while they are stale."""
+        results = self._precomputed
+        if results is None or results.version != self.version:
+            return None
+        return results
+
+    def publish_precomputed(self, results: PrecomputedResults):
+        """Publish results computed from a snapshot; stale versions are dropped."""
+        if results.version == self.version:
+            self._precomputed = results
@@ -31,6 +31,11 @@ class DataValidator:
         except ValueError:
             return False
     
+    def invalid_dates(self, dates):
+        """Index labels of values that fail validate_date, checked column-wise"""
+        parsed = pd.to_datetime(dates.astype(str), format='%Y-%m-%d', errors='coerce')
+        return dates.index[parsed.isna() | dates.isna()]
+    
     def validate_students(self):
         """Validate students.csv"""
         print("\n📋 Validating students.csv...")
@@ -74,13 +79,13 @@ class DataValidator:
         
         print(f"✓ Found {len(df)} students")
     
-    def validate_grades(self):
-        """Validate grades.csv"""
-        print("\n📊 Validating grades.csv...")
-        filepath = os.path.join(self.data_dir, 'grades.csv')
+    def validate_grades(self, filename='grades.csv'):
+        """Validate grades.csv (or another file in the same long format)"""
+        print(f"\n📊 Validating {filename}...")
+        filepath = os.path.join(self.data_dir, filename)
         
         if not os.path.exists(filepath):
-            self.errors.append("❌ grades.csv not found")
+            self.errors.append(f"❌ {filename} not found")
             return
         
         df = pd.read_csv(filepath)
@@ -91,7 +96,7 @@ class DataValidator:
         required_cols = ['student_id', 'assignment_name', 'assignment_type', 'score', 'max_score', 'date']
         missing_cols = [col for col in required_cols if col not in df.columns]
         if missing_cols:
-            self.errors.append(f"❌ Missing columns in grades.csv: {missing_cols}")
+            self.errors.append(f"❌ Missing columns in {filename}: {missing_cols}")
             return
         
         # Validate student IDs exist
@@ -115,9 +120,8 @@ class DataValidator:
             self.errors.append(f"❌ {len(negative_scores)} grade(s) have negative or zero values")
         
         # Validate dates
-        for idx, row in df.iterrows():
-            if not self.validate_date(row['date']):
-                self.warnings.append(f"⚠️  Invalid date format at row {idx+2}: {row['date']}")
+        for idx in self.invalid_dates(df['date']):
+            self.warnings.append(f"⚠️  Invalid date format at row {idx+2}: {df.at[idx, 'date']}")
         
         print(f"✓ Found {len(df)} grade entries")
     
@@ -153,16 +157,15 @@ class DataValidator:
             self.errors.append(f"❌ Invalid status values: {invalid_statuses['status'].unique().tolist()}")
         
         # Validate dates
-        for idx, row in df.iterrows():
-            if not self.validate_date(row['date']):
-                self.warnings.append(f"⚠️  Invalid date format at row {idx+2}: {row['date']}")
+        for idx in self.invalid_dates(df['date']):
+            self.warnings.append(f"⚠️  Invalid date format at row {idx+2}: {df.at[idx, 'date']}")
         
-        # Check for duplicate entries (same student, same date)
-        duplicates = df[df.duplicated(['student_id', 'date'], keep=False)]
-        if not duplicates.empty:
-            self.warnings.append(f"⚠️  {len(duplicates)} duplicate attendance entries found")
+        # Re-taking roll appends new entries; the last entry per student and date is the one used
+        replaced = int(df.duplicated(['student_id', 'date'], keep='last').sum())
         
         print(f"✓ Found {len(df)} attendance records")
+        if replaced:
+            print(f"ℹ️  {replaced} earlier entries are replaced by a later entry for the same student and date")
     
     def validate_behavior(self):
         """Validate behavior.csv"""
@@ -202,9 +205,8 @@ class DataValidator:
             self.errors.append(f"❌ Invalid severity values: {invalid_severities['severity'].unique().tolist()}")
         
         # Validate dates
-        for idx, row in df.iterrows():
-            if not self.validate_date(row['date']):
-                self.warnings.append(f"⚠️  Invalid date format at row {idx+2}: {row['date']}")
+        for idx in self.invalid_dates(df['date']):
+            self.warnings.append(f"⚠️  Invalid date format at row {idx+2}: {df.at[idx, 'date']}")
         
         # Check for missing descriptions
         missing_desc = df[df['description'].isna()]
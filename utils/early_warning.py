@@ -0,0 +1,90 @@
+"""
+Early warning for declining grade trajectories.
+
+Two measures are computed for every student at once. The first is the
+least-squares slope of assignment percentage over time, using the
+closed form
+
+    slope = (n Σxy - Σx Σy) / (n Σx² - (Σx)²)
+
+The four sums are accumulated per student with ``np.bincount``, so no
+model is fitted per student. The second is the gap between the average of
+the most recent assignments and the average of the earlier ones.
+"""
+import numpy as np
+import pandas as pd
+
+RECENT_ASSIGNMENTS = 3
+MIN_ASSIGNMENTS = 5
+# Percentage points per week
+DECLINE_SLOPE_THRESHOLD = -2.0
+# Recent average minus earlier average, in percentage points
+DECLINE_DELTA_THRESHOLD = -10.0
+
+
+def _means(positions: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    counts = np.bincount(positions, minlength=size)
+    sums = np.bincount(positions, weights=values, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def grade_trajectories(grades_df: pd.DataFrame, student_ids) -> pd.DataFrame:
+    """Grade trend measures for each student in student_ids, in that order.
+
+    Columns: ``grade_slope`` (percentage points per week), ``recent_average``
+    (last RECENT_ASSIGNMENTS assignments), ``baseline_average`` (everything
+    before them), ``grade_delta`` (recent minus baseline) and
+    ``declining_grades``. A student is flagged when they have at least
+    MIN_ASSIGNMENTS grades, a negative slope, and either the slope or the
+    delta is past its threshold. Measures are NaN where undefined.
+    """
+    student_ids = pd.Index(student_ids)
+    size = len(student_ids)
+
+    positions = student_ids.get_indexer(grades_df['student_id'])
+    percentage = (grades_df['score'] / grades_df['max_score'] * 100).to_numpy(np.float64)
+    days = grades_df['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    keep = (positions >= 0) & np.isfinite(percentage) & grades_df['date'].notna().to_numpy()
+    positions, y, days = positions[keep], percentage[keep], days[keep]
+
+    # Weeks from the middle of the date range keeps the sums well conditioned
+    x = (days - (days.min() + days.max()) / 2) / 7 if len(days) else days
+    n = np.bincount(positions, minlength=size).astype(np.float64)
+    sum_x = np.bincount(positions, weights=x, minlength=size)
+    sum_y = np.bincount(positions, weights=y, minlength=size)
+    sum_xy = np.bincount(positions, weights=x * y, minlength=size)
+    sum_xx = np.bincount(positions, weights=x * x, minlength=size)
+    denominator = n * sum_xx - sum_x ** 2
+    # All grades on (nearly) one date: no trend to measure
+    defined = denominator > 1e-9 * np.maximum(n, 1) ** 2
+    slope = np.full(size, np.nan)
+    slope[defined] = (n * sum_xy - sum_x * sum_y)[defined] / denominator[defined]
+
+    # Rank each grade from the end of its student's history; one argsort on a
+    # combined (student, day) key is several times faster than lexsort
+    first_day = days.min() if len(days) else 0
+    span = int(days.max() - first_day) + 1 if len(days) else 1
+    order = np.argsort(positions.astype(np.int64) * span + (days - first_day), kind='stable')
+    sorted_positions = positions[order]
+    starts = np.searchsorted(sorted_positions, np.arange(size))
+    rank = np.arange(len(order)) - starts[sorted_positions]
+    from_end = n[sorted_positions].astype(np.int64) - 1 - rank
+    recent = from_end < RECENT_ASSIGNMENTS
+
+    recent_average = _means(sorted_positions[recent], y[order][recent], size)
+    baseline_average = _means(sorted_positions[~recent], y[order][~recent], size)
+    delta = recent_average - baseline_average
+
+    with np.errstate(invalid='ignore'):
+        declining = (n >= MIN_ASSIGNMENTS) & (slope < 0) & (
+            (slope <= DECLINE_SLOPE_THRESHOLD) | (delta <= DECLINE_DELTA_THRESHOLD)
+        )
+    return pd.DataFrame({
+        'student_id': student_ids,
+        'grade_slope': slope.astype(np.float32),
+        'recent_average': recent_average.astype(np.float32),
+        'baseline_average': baseline_average.astype(np.float32),
+        'grade_delta': delta.astype(np.float32),
+        'declining_grades': declining,
+    })
@@ -1,7 +1,7 @@
 """
 Email generation utilities for student communications.
 """
-from typing import Dict, List
+from typing import Dict, List, Optional
 import pandas as pd
 from datetime import datetime
 
@@ -17,26 +17,74 @@ class EmailGenerator:
     MULTIPLE_INCIDENTS_THRESHOLD = 2
     ADMIN_INCIDENTS_THRESHOLD = 3
     
+    THRESHOLD_NAMES = (
+        'LOW_GRADE_THRESHOLD',
+        'CRITICAL_GRADE_THRESHOLD',
+        'LOW_ATTENDANCE_THRESHOLD',
+        'CRITICAL_ATTENDANCE_THRESHOLD',
+        'MULTIPLE_INCIDENTS_THRESHOLD',
+        'ADMIN_INCIDENTS_THRESHOLD',
+    )
+    
     def __init__(self, teacher_name: str = "Mr./Ms. Teacher", teacher_email: str = "teacher@school.edu"):
         self.teacher_name = teacher_name
         self.teacher_email = teacher_email
         self.assistant_principal_email = "assistant.principal@school.edu"
     
-    def should_send_email(self, student_summary: Dict) -> Dict[str, bool]:
-        """Determine which emails should be sent based on student performance."""
+    @property
+    def thresholds(self) -> Dict[str, float]:
+        """Current threshold values, keyed by constant name."""
+        return {name: getattr(self, name) for name in self.THRESHOLD_NAMES}
+    
+    def apply_thresholds(self, **thresholds):
+        """Override thresholds for this instance only (class defaults are untouched)."""
+        for name, value in thresholds.items():
+            if name not in self.THRESHOLD_NAMES:
+                raise ValueError(f"Unknown threshold: {name}")
+            setattr(self, name, value)
+    
+    def has_default_thresholds(self) -> bool:
+        """True if no threshold differs from the class defaults."""
+        return all(getattr(self, name) == getattr(type(self), name) for name in self.THRESHOLD_NAMES)
+    
+    @staticmethod
+    def _decline_message(student_summary: Dict) -> Optional[str]:
+        """Concern text for a declining grade trend, if flagged."""
+        if not student_summary.get('declining_grades', False):
+            return None
+        return (f"a downward trend in recent grades (last assignments average "
+                f"{student_summary['recent_average']:.1f}%, down from {student_summary['baseline_average']:.1f}%)")
+    
+    @staticmethod
+    def _alert_messages(alerts: Optional[List[Dict]], recipient: str) -> List[str]:
+        """Messages of triggered alert rules routed to a recipient."""
+        return [alert['message'] for alert in alerts or [] if recipient in alert['notify']]
+    
+    def should_send_email(self, student_summary: Dict, alerts: Optional[List[Dict]] = None) -> Dict[str, bool]:
+        """Determine which emails should be sent based on student performance.
+        
+        A declining grade trend (``declining_grades``, see
+        utils/early_warning.py) alerts the parent and student even while the
+        average is still above the thresholds. ``alerts`` are triggered alert
+        rules (see utils/alert_rules.py); each one also turns on the emails it
+        is routed to.
+        """
         grade = student_summary['average_grade']
         attendance = student_summary['attendance_rate']
         negative_incidents = student_summary['negative_incidents']
+        declining = bool(student_summary.get('declining_grades', False))
         
-        return {
+        flags = {
             'to_parent': (
                 grade < self.LOW_GRADE_THRESHOLD or 
                 attendance < self.LOW_ATTENDANCE_THRESHOLD or 
-                negative_incidents >= self.MULTIPLE_INCIDENTS_THRESHOLD
+                negative_incidents >= self.MULTIPLE_INCIDENTS_THRESHOLD or
+                declining
             ),
             'to_student': (
                 grade < self.LOW_GRADE_THRESHOLD or 
-                attendance < self.LOW_ATTENDANCE_THRESHOLD
+                attendance < self.LOW_ATTENDANCE_THRESHOLD or
+                declining
             ),
             'to_admin': (
                 grade < self.CRITICAL_GRADE_THRESHOLD or 
@@ -44,8 +92,12 @@ class EmailGenerator:
                 negative_incidents >= self.ADMIN_INCIDENTS_THRESHOLD
             )
         }
+        for alert in alerts or []:
+            for recipient in alert['notify']:
+                flags[f'to_{recipient}'] = True
+        return flags
     
-    def generate_parent_email(self, student_summary: Dict) -> Dict[str, str]:
+    def generate_parent_email(self, student_summary: Dict, alerts: Optional[List[Dict]] = None) -> Dict[str, str]:
         """Generate email to parent."""
         name = student_summary['name']
         parent_name = student_summary['parent_name']
@@ -69,6 +121,12 @@ class EmailGenerator:
         if negative_incidents >= self.MULTIPLE_INCIDENTS_THRESHOLD:
             concerns.append(f"classroom behavior ({negative_incidents} incident(s) recorded)")
         
+        decline = self._decline_message(student_summary)
+        if decline:
+            concerns.append(decline)
+        
+        concerns.extend(self._alert_messages(alerts, 'parent'))
+        
         # Build subject
         if len(concerns) > 0:
             subject = f"Concerns Regarding {name}'s Performance"
@@ -111,14 +169,16 @@ class EmailGenerator:
             'recipient_name': parent_name
         }
     
-    def generate_student_email(self, student_summary: Dict) -> Dict[str, str]:
+    def generate_student_email(self, student_summary: Dict, alerts: Optional[List[Dict]] = None) -> Dict[str, str]:
         """Generate email to student."""
         name = student_summary['name']
         grade = student_summary['average_grade']
         attendance = student_summary['attendance_rate']
+        alert_messages = self._alert_messages(alerts, 'student')
+        decline = self._decline_message(student_summary)
         
         # Build subject
-        if grade < self.LOW_GRADE_THRESHOLD or attendance < self.LOW_ATTENDANCE_THRESHOLD:
+        if grade < self.LOW_GRADE_THRESHOLD or attendance < self.LOW_ATTENDANCE_THRESHOLD or alert_messages or decline:
             subject = f"Let's Talk About Your Progress"
         else:
             subject = f"Great Work on Your Progress!"
@@ -135,6 +195,10 @@ class EmailGenerator:
             body += f"I noticed your current average is {grade:.1f}%. While you're passing, I believe you have the potential "
             body += f"to do better!\n\n"
             body += f"Let's meet to discuss strategies for improving your performance. Small changes can make a big difference.\n\n"
+        elif decline:
+            body += f"Your current average is {grade:.1f}%, but your recent assignments average "
+            body += f"{student_summary['recent_average']:.1f}%, down from {student_summary['baseline_average']:.1f}% earlier. "
+            body += f"Let's catch this early and get you back on track. Please come see me during office hours or after class.\n\n"
         else:
             body += f"I wanted to commend you on your excellent work! Your current average of {grade:.1f}% demonstrates your "
             body += f"dedication and hard work.\n\n"
@@ -143,6 +207,12 @@ class EmailGenerator:
             body += f"I've also noticed your attendance has been a concern at {attendance:.1f}%. Regular attendance is crucial "
             body += f"for your success. Please let me know if there's anything I can do to support you.\n\n"
         
+        if alert_messages:
+            body += f"I'd also like to talk with you about the following:\n"
+            for message in alert_messages:
+                body += f"• {message[:1].upper()}{message[1:]}\n"
+            body += f"\n"
+        
         body += f"Remember, I'm here to help you succeed. Don't hesitate to reach out if you need assistance.\n\n"
         body += f"Best regards,\n{self.teacher_name}\n{self.teacher_email}"
         
@@ -153,7 +223,7 @@ class EmailGenerator:
             'recipient_name': name
         }
     
-    def generate_admin_email(self, student_summary: Dict) -> Dict[str, str]:
+    def generate_admin_email(self, student_summary: Dict, alerts: Optional[List[Dict]] = None) -> Dict[str, str]:
         """Generate email to assistant principal."""
         name = student_summary['name']
         grade = student_summary['average_grade']
@@ -177,6 +247,8 @@ class EmailGenerator:
             body += f"• Attendance is critically low and impacting learning\n"
         if negative_incidents >= self.ADMIN_INCIDENTS_THRESHOLD:
             body += f"• Multiple behavioral incidents requiring administrative intervention\n"
+        for message in self._alert_messages(alerts, 'admin'):
+            body += f"• {message[:1].upper()}{message[1:]}\n"
         
         body += f"\nI have contacted the parents and student regarding these concerns. However, I believe administrative "
         body += f"support and intervention may be necessary to ensure this student's success.\n\n"
@@ -190,18 +262,18 @@ class EmailGenerator:
             'recipient_name': 'Assistant Principal'
         }
     
-    def generate_all_emails(self, student_summary: Dict) -> Dict[str, Dict]:
+    def generate_all_emails(self, student_summary: Dict, alerts: Optional[List[Dict]] = None) -> Dict[str, Dict]:
         """Generate all applicable emails for a student."""
-        should_send = self.should_send_email(student_summary)
+        should_send = self.should_send_email(student_summary, alerts)
         emails = {}
         
         if should_send['to_parent']:
-            emails['parent'] = self.generate_parent_email(student_summary)
+            emails['parent'] = self.generate_parent_email(student_summary, alerts)
         
         if should_send['to_student']:
-            emails['student'] = self.generate_student_email(student_summary)
+            emails['student'] = self.generate_student_email(student_summary, alerts)
         
         if should_send['to_admin']:
-            emails['admin'] = self.generate_admin_email(student_summary)
+            emails['admin'] = self.generate_admin_email(student_summary, alerts)
         
         return emails
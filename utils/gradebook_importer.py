@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+LMS Gradebook Importer
+Converts wide gradebook exports (one column per assignment) into the long
+grades.csv format, streaming the file in chunks so large exports fit in memory
+
+Expected export layout:
+    student_id, Name, Quiz 1, Homework 2, Midterm Exam, ...
+    Points Possible, , 20, 10, 100, ...      <- max scores (required)
+    Due Date, , 2024-01-15, 2024-01-20, ...   <- optional
+    1, John Smith, 18, 9, 88, ...
+
+Only columns with a points-possible value are treated as assignments.
+Blank cells (not submitted / not graded) are skipped.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import date
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_loader import get_data_path
+from utils.data_validator import DataValidator
+
+# Header keyword (regex) -> assignment_type; first match wins
+DEFAULT_TYPE_MAPPING = {
+    r'quiz': 'quiz',
+    r'exam|midterm|final|test': 'exam',
+    r'project': 'project',
+    r'homework|\bhw\b': 'homework',
+}
+DEFAULT_TYPE = 'assignment'
+
+MAX_SCORE_LABELS = re.compile(r'points|possible|max', re.IGNORECASE)
+DATE_LABELS = re.compile(r'date|due', re.IGNORECASE)
+OUTPUT_COLUMNS = ['student_id', 'assignment_name', 'assignment_type', 'score', 'max_score', 'date']
+
+
+def infer_assignment_type(header, type_mapping):
+    """Map an assignment column header to an assignment_type"""
+    for pattern, assignment_type in type_mapping.items():
+        if re.search(pattern, header, re.IGNORECASE):
+            return assignment_type
+    return DEFAULT_TYPE
+
+
+def read_header_rows(export_file, id_column, max_meta_rows=5):
+    """Read the column header and the leading points-possible/due-date rows.
+
+    Returns (assignments, n_meta_rows) where assignments maps each assignment
+    column to its max score and date.
+    """
+    head = pd.read_csv(export_file, nrows=max_meta_rows, dtype=str)
+    if id_column not in head.columns:
+        raise ValueError(f"Column '{id_column}' not found in {export_file}")
+
+    max_scores, dates = None, None
+    n_meta_rows = 0
+    # Meta rows are recognized by their labels; the first other row is a student
+    # (IDs need not be numeric, e.g. SIS IDs like S1042)
+    for _, row in head.iterrows():
+        label = str(row[id_column]).strip()
+        if MAX_SCORE_LABELS.search(label):
+            max_scores = row
+        elif DATE_LABELS.search(label):
+            dates = row
+        else:
+            break
+        n_meta_rows += 1
+
+    if max_scores is None:
+        raise ValueError("No 'Points Possible' row found below the header")
+
+    assignments = {}
+    for column in head.columns:
+        if column == id_column:
+            continue
+        max_score = pd.to_numeric(max_scores[column], errors='coerce')
+        if pd.isna(max_score):
+            continue
+        due = None
+        if dates is not None and not pd.isna(dates[column]):
+            due = pd.to_datetime(dates[column], errors='coerce')
+        assignments[column] = (float(max_score), due)
+    return assignments, n_meta_rows
+
+
+def import_gradebook(export_file, output_file, default_date=None, type_mapping=None,
+                     id_column='student_id', chunk_size=1000):
+    """Stream a wide gradebook into a long grades file; returns rows written"""
+    type_mapping = type_mapping or DEFAULT_TYPE_MAPPING
+    default_date = default_date or date.today().isoformat()
+    assignments, n_meta_rows = read_header_rows(export_file, id_column)
+    if not assignments:
+        raise ValueError("No assignment columns with a points-possible value")
+
+    meta = pd.DataFrame({
+        'assignment_name': list(assignments),
+        'assignment_type': [infer_assignment_type(name, type_mapping) for name in assignments],
+        'max_score': [max_score for max_score, _ in assignments.values()],
+        'date': [due.strftime('%Y-%m-%d') if due is not None and not pd.isna(due) else default_date
+                 for _, due in assignments.values()],
+    })
+
+    rows_written = 0
+    chunks = pd.read_csv(
+        export_file,
+        usecols=[id_column] + list(assignments),
+        skiprows=range(1, n_meta_rows + 1),
+        chunksize=chunk_size,
+    )
+    with open(output_file, 'w', newline='') as out:
+        pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(out, index=False)
+        for chunk in chunks:
+            long = chunk.melt(id_vars=[id_column], var_name='assignment_name', value_name='score')
+            long['score'] = pd.to_numeric(long['score'], errors='coerce')
+            long = long.dropna(subset=['score'])
+            long = long.rename(columns={id_column: 'student_id'}).merge(meta, on='assignment_name')
+            long = long.sort_values('student_id', kind='stable')
+            long[OUTPUT_COLUMNS].to_csv(out, index=False, header=False, float_format='%g')
+            rows_written += len(long)
+    return rows_written
+
+
+def load_type_mapping(path):
+    """Read a {"regex": "assignment_type"} JSON mapping"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a wide LMS gradebook export to grades.csv format")
+    parser.add_argument('export_file', help="Wide gradebook CSV exported from the LMS")
+    parser.add_argument('output_file', nargs='?', default='data/grades_imported.csv',
+                        help="Long-format output (default: data/grades_imported.csv)")
+    parser.add_argument('--id-column', default='student_id', help="Student ID column header")
+    parser.add_argument('--date', help="Date for assignments without a due date (default: today)")
+    parser.add_argument('--type-mapping', help="JSON file mapping header regexes to assignment types")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Students per chunk")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("📥 LMS Gradebook Importer")
+    print("="*60)
+
+    type_mapping = load_type_mapping(args.type_mapping) if args.type_mapping else None
+    try:
+        rows = import_gradebook(args.export_file, args.output_file, args.date, type_mapping,
+                                args.id_column, args.chunk_size)
+    except (ValueError, OSError) as e:
+        print(f"❌ Error importing {args.export_file}: {e}")
+        sys.exit(1)
+
+    print(f"✅ Imported: {args.export_file}")
+    print(f"   → Saved to: {args.output_file}")
+    print(f"   → {rows} grade rows")
+
+    # Student IDs are checked against the project roster wherever the output goes
+    validator = DataValidator(os.path.dirname(get_data_path("students.csv")))
+    validator.validate_grades(os.path.abspath(args.output_file))
+    for message in validator.errors + validator.warnings:
+        print(f"  {message}")
+
+    print("="*60)
+    if validator.errors:
+        print("❌ Please fix the errors above before replacing data/grades.csv")
+        sys.exit(1)
+    print("💡 Review the output, then replace (or append to) data/grades.csv")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Background worker that keeps the shared data store warm.
+
+Polls the data directory for changed CSV files, reloads the store when
+they change (except through the store's own appends), and precomputes
+send flags and rendered emails so page handlers only read ready-made
+results. Each new data version is also recorded in the daily summary
+history.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from utils.data_loader import get_data_path
+from utils.data_store import DataSnapshot, DataStore, PrecomputedResults
+from utils.email_generator import EmailGenerator
+from utils.snapshot_history import SnapshotHistory
+
+DEFAULT_PROFILE = ("Mr./Ms. Teacher", "teacher@school.edu")
+
+
+def data_fingerprint(data_dir: str) -> Tuple:
+    """(name, mtime, size) of every data or rules file in the data directory."""
+    entries = []
+    for entry in os.scandir(data_dir):
+        if entry.is_file() and entry.name.endswith(('.csv', '.json', '.yaml', '.yml')):
+            stat = entry.stat()
+            entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+def precompute(snapshot: DataSnapshot, profiles: Set[Tuple[str, str]]) -> PrecomputedResults:
+    """Send flags for every summary and rendered emails for each teacher profile."""
+    # Thresholds are class constants, so flags don't depend on the profile
+    alerts = [snapshot.alerts.for_student(position) for position in range(len(snapshot.summaries))]
+    send_flags = [
+        EmailGenerator().should_send_email(summary, student_alerts)
+        for summary, student_alerts in zip(snapshot.summaries, alerts)
+    ]
+
+    emails: Dict[Tuple[str, str], list] = {}
+    for teacher_name, teacher_email in profiles:
+        email_gen = EmailGenerator(teacher_name, teacher_email)
+        emails[(teacher_name, teacher_email)] = [
+            email_gen.generate_all_emails(summary, student_alerts) if any(flags.values()) else {}
+            for summary, student_alerts, flags in zip(snapshot.summaries, alerts, send_flags)
+        ]
+
+    return PrecomputedResults(
+        version=snapshot.version,
+        computed_at=datetime.now(),
+        send_flags=send_flags,
+        emails=emails,
+    )
+
+
+class PrecomputeWorker(threading.Thread):
+    """Daemon thread that watches the data directory and warms the store."""
+
+    POLL_INTERVAL = 2.0
+    MAX_PROFILES = 8
+
+    def __init__(self, store: DataStore, data_dir: Optional[str] = None,
+                 poll_interval: float = POLL_INTERVAL):
+        super().__init__(name="precompute-worker", daemon=True)
+        self.store = store
+        self.data_dir = data_dir or os.path.dirname(get_data_path("students.csv", store.data_dir))
+        self.poll_interval = poll_interval
+        self.last_checked: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._profiles: Set[Tuple[str, str]] = {DEFAULT_PROFILE}
+        self._profiles_changed = False
+        # Guards _profiles and _profiles_changed between session threads and the worker
+        self._profiles_lock = threading.Lock()
+        self._fingerprint = None
+        self.history = SnapshotHistory(os.path.join(self.data_dir, "history"))
+        self._recorded_version = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def register_profile(self, teacher_name: str, teacher_email: str):
+        """Ask the worker to also render emails with this signature.
+
+        Beyond MAX_PROFILES, further signatures are rendered on demand instead.
+        """
+        profile = (teacher_name, teacher_email)
+        with self._profiles_lock:
+            if profile in self._profiles or len(self._profiles) >= self.MAX_PROFILES:
+                return
+            self._profiles = self._profiles | {profile}
+            self._profiles_changed = True
+        self.wake()
+
+    def wake(self):
+        """Skip the rest of the current poll interval."""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    @property
+    def is_stale(self) -> bool:
+        """True when the files on disk differ from the published snapshot."""
+        return self._fingerprint is not None and self._fingerprint != data_fingerprint(self.data_dir)
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def poll(self):
+        """One watch-and-precompute cycle."""
+        fingerprint = data_fingerprint(self.data_dir)
+        if self._fingerprint is not None and fingerprint != self._fingerprint:
+            # Rows appended through the store are already in its snapshot
+            if not self.store.writer.explains(self._fingerprint, fingerprint):
+                self.store.reload()
+        self._fingerprint = fingerprint
+        self.last_checked = datetime.now()
+
+        snapshot = self.store.snapshot
+        # Clear the flag and copy the profiles together, so a profile registered
+        # after this point sets the flag again for the next cycle
+        with self._profiles_lock:
+            refresh = self.store.precomputed is None or self._profiles_changed
+            self._profiles_changed = False
+            profiles = set(self._profiles)
+        if refresh:
+            self.store.publish_precomputed(precompute(snapshot, profiles))
+
+        # Today's history entry always reflects the latest data version
+        if snapshot.version != self._recorded_version:
+            self.history.record(snapshot.summaries)
+            self._recorded_version = snapshot.version
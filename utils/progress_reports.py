@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Bulk Progress Reports
+Renders a printable HTML progress report for every student (the summary
+metrics plus the grades, attendance and behavior tables from the Student
+Records page) across a process pool and streams them into one zip file
+
+Usage: python utils/progress_reports.py [output.zip] [--workers 4] [--data-dir data/]
+"""
+
+import argparse
+import html
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.attendance_matrix import CHRONIC_ABSENCE_THRESHOLD
+
+BATCH_SIZE = 100
+
+REPORT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Progress Report - {name}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #222; }}
+h1 {{ margin-bottom: 0; }}
+.info {{ color: #555; margin-bottom: 1.5em; }}
+.metrics td {{ padding: 0.3em 1.5em 0.3em 0; }}
+table.records {{ border-collapse: collapse; width: 100%; margin-bottom: 1.5em; }}
+table.records th, table.records td {{ border: 1px solid #ccc; padding: 0.3em 0.6em; text-align: left; }}
+table.records th {{ background: #f0f0f0; }}
+.warning {{ color: #b00; }}
+@media print {{ body {{ margin: 0; }} }}
+</style>
+</head>
+<body>
+<h1>{name}</h1>
+<div class="info">
+Student ID {student_id} &middot; Grade {grade_level} &middot; {email}<br>
+Parent/Guardian: {parent_name} ({parent_email})<br>
+Report prepared by {teacher_name} on {generated_on}
+</div>
+<h2>Summary</h2>
+<table class="metrics">
+<tr><td>Average Grade</td><td><b>{average_grade:.1f}%</b></td></tr>
+<tr><td>Attendance Rate</td><td><b>{attendance_rate:.1f}%</b></td></tr>
+<tr><td>Tardy / Excused</td><td>{tardy_rate:.1f}% / {excused_rate:.1f}%</td></tr>
+<tr><td>Longest Run of Missed Days</td><td>{longest_absence_streak}</td></tr>
+<tr><td>Behavior</td><td>+{positive_incidents} / -{negative_incidents}</td></tr>
+</table>
+{chronic_warning}
+<h2>Grades</h2>
+{grades_table}
+<h2>Attendance</h2>
+{attendance_table}
+<h2>Behavior</h2>
+{behavior_table}
+</body>
+</html>
+"""
+
+
+def _cell(value):
+    if isinstance(value, float):
+        return '' if value != value else f"{value:g}"
+    return html.escape(str(value))
+
+
+def _table(df, columns, headers, empty_message):
+    # Built by hand: DataFrame.to_html is several times slower for small tables
+    if df.empty:
+        return f"<p>{html.escape(empty_message)}</p>"
+    df = df[columns].copy()
+    df['date'] = df['date'].dt.strftime('%Y-%m-%d')
+    head = ''.join(f"<th>{header}</th>" for header in headers)
+    body = '\n'.join(
+        '<tr>' + ''.join(f"<td>{_cell(value)}</td>" for value in row) + '</tr>'
+        for row in df.itertuples(index=False, name=None)
+    )
+    return f'<table class="records">\n<thead><tr>{head}</tr></thead>\n<tbody>\n{body}\n</tbody>\n</table>'
+
+
+def render_report(summary, grades, attendance, behavior, teacher_name, generated_on):
+    """One student's progress report as an HTML page"""
+    grades = grades.copy()
+    grades['percentage'] = (grades['score'] / grades['max_score'] * 100).round(1)
+
+    fields = {key: html.escape(str(value)) if isinstance(value, str) else value
+              for key, value in summary.items()}
+    chronic_warning = ""
+    if summary['chronic_absence']:
+        chronic_warning = (f'<p class="warning">Chronically absent: missed '
+                           f'{CHRONIC_ABSENCE_THRESHOLD:.0%} or more of school days.</p>')
+
+    return REPORT_TEMPLATE.format(
+        **fields,
+        teacher_name=html.escape(teacher_name),
+        generated_on=generated_on,
+        chronic_warning=chronic_warning,
+        grades_table=_table(grades, ['date', 'assignment_name', 'assignment_type', 'score', 'max_score', 'percentage'],
+                            ['Date', 'Assignment', 'Type', 'Score', 'Max Score', 'Percentage'],
+                            "No grade records found."),
+        attendance_table=_table(attendance, ['date', 'status', 'notes'], ['Date', 'Status', 'Notes'],
+                                "No attendance records found."),
+        behavior_table=_table(behavior, ['date', 'incident_type', 'severity', 'description'],
+                              ['Date', 'Type', 'Severity', 'Description'],
+                              "No behavior records found."),
+    )
+
+
+def report_filename(summary):
+    """e.g. 0042_John_Smith.html"""
+    name = ''.join(c if c.isalnum() else '_' for c in str(summary['name'])).strip('_')
+    return f"{int(summary['student_id']):04d}_{name}.html"
+
+
+class StudentSlices:
+    """Per-student row ranges of a frame, found once by sorting on student_id"""
+
+    def __init__(self, df, student_ids):
+        self.df = df.sort_values('student_id', kind='stable')
+        keys = self.df['student_id'].to_numpy()
+        student_ids = np.asarray(student_ids)
+        self.starts = dict(zip(student_ids.tolist(), np.searchsorted(keys, student_ids, 'left').tolist()))
+        self.stops = dict(zip(student_ids.tolist(), np.searchsorted(keys, student_ids, 'right').tolist()))
+
+    def __getitem__(self, student_id):
+        return self.df.iloc[self.starts[student_id]:self.stops[student_id]]
+
+
+def render_batch(batch, teacher_name, generated_on):
+    """Worker task: render a batch of (summary, grades, attendance, behavior)
+
+    Returns (filename, html bytes, render seconds) per student.
+    """
+    results = []
+    for summary, grades, attendance, behavior in batch:
+        start = time.perf_counter()
+        report = render_report(summary, grades, attendance, behavior, teacher_name, generated_on)
+        results.append((report_filename(summary), report.encode('utf-8'), time.perf_counter() - start))
+    return results
+
+
+_main_swap_lock = threading.Lock()
+
+
+def _start_without_main(process):
+    """Start a worker while a bare module stands in for __main__.
+
+    Spawned and fork-server children re-run the parent's main script before
+    anything else, and under Streamlit that is the whole app.
+    """
+    with _main_swap_lock:
+        main = sys.modules['__main__']
+        bare = sys.modules['__main__'] = types.ModuleType('__main__')
+        try:
+            multiprocessing.process.BaseProcess.start(process)
+        finally:
+            # Leave it alone if another thread (e.g. a Streamlit rerun) replaced it meanwhile
+            if sys.modules['__main__'] is bare:
+                sys.modules['__main__'] = main
+
+
+class _SpawnWorker(multiprocessing.context.SpawnProcess):
+    start = _start_without_main
+
+
+class _SpawnContext(multiprocessing.context.SpawnContext):
+    Process = _SpawnWorker
+
+
+if "forkserver" in multiprocessing.get_all_start_methods():
+    class _ForkServerWorker(multiprocessing.context.ForkServerProcess):
+        start = _start_without_main
+
+    class _ForkServerContext(multiprocessing.context.ForkServerContext):
+        Process = _ForkServerWorker
+
+
+def _worker_context():
+    """Multiprocessing context for report workers.
+
+    Workers are never forked from the calling process, because a fork of a
+    multithreaded server can inherit a lock held by another thread and
+    deadlock. Where available, they fork from a single-threaded fork server
+    that has preloaded this module.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return _SpawnContext()
+    context = _ForkServerContext()
+    context.set_forkserver_preload(['utils.progress_reports'])
+    return context
+
+
+def make_executor(workers=None):
+    """Process pool for rendering reports, safe to create inside a threaded server."""
+    # The worker classes must be pickled by their importable name, also when this file runs as a script
+    from utils.progress_reports import _worker_context as worker_context
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=worker_context())
+
+
+def generate_reports(snapshot, output, teacher_name="Mr./Ms. Teacher", workers=None,
+                     batch_size=BATCH_SIZE, progress=None, executor=None):
+    """Render every student's report in a process pool and stream them into a zip.
+
+    ``output`` is a path or a writable binary file object. ``progress`` is
+    called as progress(done, total) as batches finish. Pass a long-lived
+    ``executor`` (from ``make_executor``) to share one pool between calls;
+    ``workers`` should then be its size. Returns a dict of timing statistics.
+    """
+    # Submitted by its importable name: workers don't load this file when it runs as a script
+    from utils.progress_reports import render_batch as render
+
+    start = time.perf_counter()
+    generated_on = date.today().strftime('%B %d, %Y')
+    student_ids = snapshot.summaries.column('student_id')
+    grades = StudentSlices(snapshot.grades, student_ids)
+    attendance = StudentSlices(snapshot.attendance, student_ids)
+    behavior = StudentSlices(snapshot.behavior, student_ids)
+
+    def batches():
+        for first in range(0, len(student_ids), batch_size):
+            batch = []
+            for position in range(first, min(first + batch_size, len(student_ids))):
+                student_id = int(student_ids[position])
+                batch.append((dict(snapshot.summaries[position]), grades[student_id],
+                              attendance[student_id], behavior[student_id]))
+            yield batch
+
+    render_seconds = []
+    total = len(student_ids)
+    workers = workers or os.cpu_count() or 1
+
+    def collect(futures, archive):
+        for future in as_completed(futures):
+            for filename, report, seconds in future.result():
+                archive.writestr(filename, report)
+                render_seconds.append(seconds)
+            if progress is not None:
+                progress(len(render_seconds), total)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = make_executor(workers)
+    try:
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            # Only a few batches in flight, so memory stays flat on large rosters
+            pending = set()
+            for batch in batches():
+                pending.add(executor.submit(render, batch, teacher_name, generated_on))
+                if len(pending) >= 4 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done, archive)
+            collect(pending, archive)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    render_ms = np.array(render_seconds) * 1000
+    return {
+        'reports': len(render_seconds),
+        'seconds': time.perf_counter() - start,
+        'mean_ms': float(render_ms.mean()) if len(render_ms) else 0.0,
+        'p95_ms': float(np.percentile(render_ms, 95)) if len(render_ms) else 0.0,
+        'max_ms': float(render_ms.max()) if len(render_ms) else 0.0,
+    }
+
+
+def main():
+    from utils.data_store import build_snapshot
+
+    parser = argparse.ArgumentParser(description="Generate a progress report for every student")
+    parser.add_argument('output', nargs='?', default='progress_reports.zip', help="Zip file to write")
+    parser.add_argument('--data-dir', help="Folder with the four CSV files (default: data/)")
+    parser.add_argument('--teacher', default="Mr./Ms. Teacher", help="Name shown on the reports")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("🗂️ Bulk Progress Reports")
+    print("="*60)
+
+    snapshot = build_snapshot(version=1, data_dir=args.data_dir)
+
+    def progress(done, total):
+        print(f"\r  {done}/{total} reports", end='', flush=True)
+
+    stats = generate_reports(snapshot, args.output, args.teacher, args.workers, progress=progress)
+    print()
+    print(f"✅ {stats['reports']} reports in {stats['seconds']:.1f}s → {args.output}")
+    print(f"   Per report: mean {stats['mean_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Daily history of per-student summaries.
+
+Once per day (and again whenever the data changes that day) the summary
+columns below are saved as one compact columnar file, so week-over-week
+deltas and sparklines only read stored snapshots instead of recomputing
+past figures from raw data. Older days are thinned out to keep the
+history small: every day is kept for DAILY_RETENTION_DAYS, then one day
+per week for WEEKLY_RETENTION_WEEKS, and anything older is deleted.
+"""
+import os
+import re
+import tempfile
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.summary_table import SummaryTable
+
+# Column -> stored dtype (about 16 bytes per student per day)
+HISTORY_COLUMNS = {
+    'student_id': np.int32,
+    'average_grade': np.float32,
+    'attendance_rate': np.float32,
+    'positive_incidents': np.uint16,
+    'negative_incidents': np.uint16,
+}
+DAILY_RETENTION_DAYS = 14
+WEEKLY_RETENTION_WEEKS = 52
+FILENAME = re.compile(r'^summaries-(\d{4}-\d{2}-\d{2})\.npz$')
+
+
+class SnapshotHistory:
+    """Per-day summary snapshots stored as .npz files in one folder."""
+
+    def __init__(self, history_dir: str):
+        self.history_dir = history_dir
+
+    def _path(self, day: date) -> str:
+        return os.path.join(self.history_dir, f"summaries-{day.isoformat()}.npz")
+
+    def days(self) -> List[date]:
+        """Days with a stored snapshot, oldest first."""
+        if not os.path.isdir(self.history_dir):
+            return []
+        days = []
+        for name in os.listdir(self.history_dir):
+            match = FILENAME.match(name)
+            if match:
+                days.append(date.fromisoformat(match.group(1)))
+        return sorted(days)
+
+    def fingerprint(self) -> tuple:
+        """(day, mtime) of every stored snapshot; changes whenever one is written or removed."""
+        return tuple((day, os.stat(self._path(day)).st_mtime_ns) for day in self.days())
+
+    def record(self, summaries: SummaryTable, day: Optional[date] = None):
+        """Save (or replace) the snapshot for a day, then apply retention."""
+        day = day or date.today()
+        os.makedirs(self.history_dir, exist_ok=True)
+        arrays = {}
+        for column, dtype in HISTORY_COLUMNS.items():
+            values = summaries.column(column)
+            if np.issubdtype(dtype, np.unsignedinteger):
+                values = np.clip(values, 0, np.iinfo(dtype).max)
+            arrays[column] = values.astype(dtype)
+        # Write then rename, so readers never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.history_dir, suffix='.npz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, self._path(day))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.compact(today=day)
+
+    def load(self, day: date) -> pd.DataFrame:
+        """One day's snapshot, indexed by student_id."""
+        with np.load(self._path(day)) as arrays:
+            frame = pd.DataFrame({column: arrays[column] for column in HISTORY_COLUMNS})
+        return frame.set_index('student_id')
+
+    def snapshot_on_or_before(self, day: date) -> Optional[date]:
+        """Most recent stored day not after ``day``."""
+        earlier = [stored for stored in self.days() if stored <= day]
+        return earlier[-1] if earlier else None
+
+    def load_all(self) -> Dict[date, pd.DataFrame]:
+        return {day: self.load(day) for day in self.days()}
+
+    def compact(self, today: Optional[date] = None) -> int:
+        """Apply the retention policy; returns the number of snapshots removed."""
+        today = today or date.today()
+        daily_cutoff = today - timedelta(days=DAILY_RETENTION_DAYS)
+        weekly_cutoff = today - timedelta(weeks=WEEKLY_RETENTION_WEEKS)
+
+        # Beyond the daily window keep the last stored day of each ISO week
+        last_of_week = {}
+        for day in self.days():
+            if day < daily_cutoff:
+                last_of_week[day.isocalendar()[:2]] = day
+        keep_weekly = set(last_of_week.values())
+
+        removed = 0
+        for day in self.days():
+            if day >= daily_cutoff or (day >= weekly_cutoff and day in keep_weekly):
+                continue
+            os.remove(self._path(day))
+            removed += 1
+        return removed
+
+
+def class_history(snapshots: Dict[date, pd.DataFrame], at_risk_grade: float = 70.0,
+                  at_risk_attendance: float = 80.0) -> pd.DataFrame:
+    """Class-wide figures per stored day, matching the Dashboard metrics."""
+    rows = []
+    for day, frame in snapshots.items():
+        rows.append({
+            'date': pd.Timestamp(day),
+            'students': len(frame),
+            'class_average': float(frame['average_grade'].mean()) if len(frame) else np.nan,
+            'average_attendance': float(frame['attendance_rate'].mean()) if len(frame) else np.nan,
+            'at_risk': int(((frame['average_grade'] < at_risk_grade) |
+                            (frame['attendance_rate'] < at_risk_attendance)).sum()),
+        })
+    return pd.DataFrame(rows, columns=['date', 'students', 'class_average', 'average_attendance', 'at_risk']) \
+        .set_index('date')
+
+
+def student_history(snapshots: Dict[date, pd.DataFrame], column: str, student_ids) -> List[List[float]]:
+    """Per-student series of one column across stored days (for sparklines)."""
+    if not snapshots:
+        return [[] for _ in student_ids]
+    # Days recorded before the roster was deduplicated may repeat a student; keep the last row
+    wide = pd.concat({day: frame.loc[~frame.index.duplicated(keep='last'), column]
+                      for day, frame in snapshots.items()}, axis=1)
+    wide = wide.reindex(pd.Index(student_ids))
+    return [[value for value in row if not np.isnan(value)] for row in wide.to_numpy(np.float64)]
@@ -0,0 +1,136 @@
+"""
+Search index for the student selectors.
+"""
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+def _normalize(text) -> str:
+    """Lower-case and collapse whitespace for matching."""
+    return " ".join(str(text).lower().split())
+
+
+def _trigrams(text: str) -> set:
+    """Return the set of padded character trigrams of a string."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class StudentSearchIndex:
+    """Prefix and fuzzy lookup of students by name, student ID and email.
+
+    Built once per data load. Prefix matches come from a sorted key array
+    searched with bisect; when those run short, a trigram inverted index
+    fills in fuzzy matches (typos, transposed letters).
+    """
+
+    MAX_RESULTS = 50
+    MIN_FUZZY_SCORE = 0.3
+
+    def __init__(self, students_df: pd.DataFrame):
+        self.student_ids = [int(sid) for sid in students_df['student_id']]
+        self._positions = {sid: pos for pos, sid in enumerate(self.student_ids)}
+        self._labels = {
+            sid: f"{name} (ID {sid})"
+            for sid, name in zip(self.student_ids, students_df['name'])
+        }
+
+        keyed = []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        gram_counts = []
+        for pos, (sid, name, email) in enumerate(
+            zip(self.student_ids, students_df['name'], students_df['email'])
+        ):
+            name = _normalize(name)
+            email = _normalize(email)
+            keys = {name, str(sid), email, email.split('@')[0]}
+            keys.update(name.split())
+            keyed.extend((key, pos) for key in keys if key)
+
+            grams = _trigrams(name)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings[gram].append(pos)
+
+        self._grams = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+        self._gram_counts = np.array(gram_counts, dtype=np.int32)
+
+        keyed.sort()
+        self._keys = [key for key, _ in keyed]
+        self._key_positions = [pos for _, pos in keyed]
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Rough size estimate: per-key string and list slots, per-student dict entries, trigram postings."""
+        sample = self._keys[::max(1, len(self._keys) // 1000)]
+        key_bytes = sum(sys.getsizeof(key) for key in sample) * len(self._keys) // max(len(sample), 1)
+        # Two list slots plus a boxed position per key; ids, positions and labels per student
+        per_student = 8 + 2 * 100 + 80
+        postings = sum(rows.nbytes + 112 for rows in self._grams.values())
+        return key_bytes + len(self._keys) * (16 + 28) + len(self) * per_student + postings + self._gram_counts.nbytes
+
+    def __contains__(self, student_id) -> bool:
+        return student_id in self._positions
+
+    def position(self, student_id: int) -> int:
+        """Row position of a student in the indexed DataFrame."""
+        return self._positions[student_id]
+
+    def label(self, student_id: int) -> str:
+        """Display label for a selector option."""
+        return self._labels[student_id]
+
+    def prefix_search(self, query: str, limit: int = MAX_RESULTS) -> List[int]:
+        """Student IDs with a name word, full name, ID or email starting with query."""
+        query = _normalize(query)
+        matches = []
+        seen = set()
+        i = bisect_left(self._keys, query)
+        while len(matches) < limit and i < len(self._keys) and self._keys[i].startswith(query):
+            pos = self._key_positions[i]
+            if pos not in seen:
+                seen.add(pos)
+                matches.append(pos)
+            i += 1
+        return [self.student_ids[pos] for pos in matches]
+
+    def fuzzy_search(self, query: str, limit: int = MAX_RESULTS) -> List[int]:
+        """Student IDs ranked by trigram (Dice) similarity of query to name."""
+        query_grams = _trigrams(_normalize(query))
+        hits = [self._grams[gram] for gram in query_grams if gram in self._grams]
+        if not hits:
+            return []
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.student_ids))
+        scores = 2 * shared / (len(query_grams) + self._gram_counts)
+        candidates = np.flatnonzero(scores >= self.MIN_FUZZY_SCORE)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [self.student_ids[pos] for pos in ranked]
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[int]:
+        """Prefix matches first, topped up with fuzzy matches.
+
+        An empty query returns the first ``limit`` students in roster order.
+        """
+        if not query or not query.strip():
+            return self.student_ids[:limit]
+
+        results = self.prefix_search(query, limit)
+        if len(results) < limit:
+            seen = set(results)
+            for student_id in self.fuzzy_search(query, limit):
+                if student_id not in seen:
+                    results.append(student_id)
+                    if len(results) == limit:
+                        break
+        return results
@@ -0,0 +1,165 @@
+"""
+Compact columnar storage for per-student summaries.
+"""
+from collections.abc import Mapping
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+from utils.attendance_matrix import AttendanceMatrix
+from utils.data_loader import frame_nbytes
+from utils.early_warning import grade_trajectories
+
+
+# Summary columns derived from the attendance matrix
+ATTENDANCE_SUMMARY_COLUMNS = ['attendance_rate', 'tardy_rate', 'excused_rate', 'longest_absence_streak', 'chronic_absence']
+
+
+def _incident_counts(behavior_df: pd.DataFrame, student_ids: pd.Index, incident_type: str) -> np.ndarray:
+    matching = behavior_df.loc[behavior_df['incident_type'] == incident_type, 'student_id']
+    return matching.value_counts().reindex(student_ids, fill_value=0).to_numpy(np.int32)
+
+
+def incident_counts(behavior_df: pd.DataFrame, student_ids: pd.Index) -> Dict[str, np.ndarray]:
+    """positive_incidents and negative_incidents columns for the given students."""
+    return {
+        'positive_incidents': _incident_counts(behavior_df, student_ids, 'positive'),
+        'negative_incidents': _incident_counts(behavior_df, student_ids, 'disruption'),
+    }
+
+
+def summarize_all_students(students_df: pd.DataFrame, grades_df: pd.DataFrame,
+                           attendance_df: pd.DataFrame, behavior_df: pd.DataFrame,
+                           attendance_matrix: AttendanceMatrix = None) -> pd.DataFrame:
+    """Summaries for the whole roster as one typed DataFrame.
+
+    Vectorized equivalent of ``summarize_student`` applied to every row:
+    students without grades average 0.0, without attendance 100.0. The
+    attendance columns come from the attendance matrix, which is built
+    here if not supplied, and the grade trend columns from
+    ``early_warning.grade_trajectories``.
+    """
+    student_ids = pd.Index(students_df['student_id'])
+    if attendance_matrix is None:
+        attendance_matrix = AttendanceMatrix.from_frame(attendance_df, student_ids)
+    attendance = attendance_matrix.metrics()
+
+    percentage = grades_df['score'] / grades_df['max_score'] * 100
+    average_grade = percentage.groupby(grades_df['student_id']).mean()
+    trajectories = grade_trajectories(grades_df, student_ids)
+
+    return pd.DataFrame({
+        'student_id': students_df['student_id'].to_numpy(np.int32),
+        'name': pd.Categorical(students_df['name']),
+        'email': students_df['email'].to_numpy(),
+        'parent_name': pd.Categorical(students_df['parent_name']),
+        'parent_email': students_df['parent_email'].to_numpy(),
+        'grade_level': pd.Categorical(students_df['grade_level']),
+        'average_grade': average_grade.reindex(student_ids, fill_value=0.0).to_numpy(np.float64),
+        'attendance_rate': attendance['attendance_rate'].to_numpy(np.float64),
+        **incident_counts(behavior_df, student_ids),
+        'tardy_rate': attendance['tardy_rate'].to_numpy(np.float32),
+        'excused_rate': attendance['excused_rate'].to_numpy(np.float32),
+        'longest_absence_streak': attendance['longest_absence_streak'].to_numpy(),
+        'chronic_absence': attendance['chronic_absence'].to_numpy(),
+        'grade_slope': trajectories['grade_slope'].to_numpy(),
+        'recent_average': trajectories['recent_average'].to_numpy(),
+        'baseline_average': trajectories['baseline_average'].to_numpy(),
+        'grade_delta': trajectories['grade_delta'].to_numpy(),
+        'declining_grades': trajectories['declining_grades'].to_numpy(),
+    })
+
+
+class SummaryRow(Mapping):
+    """Read-only dict-like view of one row of a SummaryTable.
+
+    Holds only the table and a row position, so ``EmailGenerator`` can index
+    it like a summary dict without a dict ever being built.
+    """
+    __slots__ = ('_table', '_position')
+
+    def __init__(self, table: 'SummaryTable', position: int):
+        self._table = table
+        self._position = position
+
+    def __getitem__(self, key):
+        return self._table.value(key, self._position)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.columns)
+
+    def __len__(self) -> int:
+        return len(self._table.columns)
+
+    def __repr__(self) -> str:
+        return f"SummaryRow({dict(self)!r})"
+
+
+class SummaryTable:
+    """Summaries for every student, held column-wise.
+
+    Numeric columns are plain NumPy arrays; categorical columns keep only
+    their integer codes plus one copy of each distinct value.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.columns = list(frame.columns)
+        self._arrays = {}
+        self._categories = {}
+        for column in self.columns:
+            values = frame[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                self._arrays[column] = values.cat.codes.to_numpy()
+                self._categories[column] = values.cat.categories.to_numpy()
+            else:
+                self._arrays[column] = values.to_numpy()
+
+    @classmethod
+    def from_frames(cls, students_df: pd.DataFrame, grades_df: pd.DataFrame,
+                    attendance_df: pd.DataFrame, behavior_df: pd.DataFrame,
+                    attendance_matrix: AttendanceMatrix = None) -> 'SummaryTable':
+        return cls(summarize_all_students(students_df, grades_df, attendance_df, behavior_df,
+                                          attendance_matrix))
+
+    def with_updates(self, positions: np.ndarray, updates: Dict[str, np.ndarray]) -> 'SummaryTable':
+        """Copy with new values for some rows of some numeric columns.
+
+        Untouched columns are shared with this table, which stays valid for
+        readers still holding it.
+        """
+        frame = self.frame.copy(deep=False)
+        for column, values in updates.items():
+            array = frame[column].to_numpy(copy=True)
+            array[positions] = values
+            frame[column] = array
+        return SummaryTable(frame)
+
+    def value(self, column: str, position: int):
+        """Single cell lookup by column name and row position."""
+        value = self._arrays[column][position]
+        categories = self._categories.get(column)
+        if categories is not None:
+            return categories[value] if value >= 0 else None
+        return value
+
+    def column(self, column: str) -> np.ndarray:
+        """Whole numeric column as a NumPy array."""
+        return self._arrays[column]
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __getitem__(self, position: int) -> SummaryRow:
+        if not -len(self) <= position < len(self):
+            raise IndexError(position)
+        return SummaryRow(self, position % len(self))
+
+    def __iter__(self) -> Iterator[SummaryRow]:
+        for position in range(len(self)):
+            yield SummaryRow(self, position)
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the summary frame, including strings."""
+        return frame_nbytes(self.frame)
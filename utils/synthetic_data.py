@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Synthetic Roster Generator
+Builds realistic-looking student data of any size for benchmarks and load tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = ['John', 'Emma', 'Michael', 'Sophia', 'William', 'Olivia', 'James', 'Ava',
+               'Benjamin', 'Isabella', 'Lucas', 'Mia', 'Henry', 'Amelia', 'Daniel', 'Harper']
+LAST_NAMES = ['Smith', 'Johnson', 'Brown', 'Davis', 'Miller', 'Wilson', 'Moore', 'Taylor',
+              'Anderson', 'Thomas', 'Jackson', 'White', 'Harris', 'Martin', 'Garcia', 'Lee']
+ASSIGNMENT_TYPES = ['quiz', 'assignment', 'exam', 'project', 'homework']
+ATTENDANCE_STATUSES = ['present', 'absent', 'tardy', 'excused']
+ATTENDANCE_WEIGHTS = [0.88, 0.06, 0.04, 0.02]
+INCIDENT_TYPES = ['positive', 'disruption', 'tardy', 'unprepared', 'other']
+SEVERITIES = ['low', 'medium', 'high']
+
+
+def generate_roster(n_students, n_assignments=20, n_days=60, incidents_per_student=1.0,
+                    start_date='2024-01-15', seed=0):
+    """Return (students, grades, attendance, behavior) frames shaped like the CSVs."""
+    rng = np.random.default_rng(seed)
+    student_ids = np.arange(1, n_students + 1)
+
+    first = rng.choice(FIRST_NAMES, n_students)
+    last = rng.choice(LAST_NAMES, n_students)
+    parent_first = rng.choice(FIRST_NAMES, n_students)
+    names = pd.Series(first) + ' ' + pd.Series(last)
+    handles = (pd.Series(first).str.lower() + '.' + pd.Series(last).str.lower()
+               + student_ids.astype(str))
+    students = pd.DataFrame({
+        'student_id': student_ids,
+        'name': names,
+        'email': handles + '@school.edu',
+        'parent_name': pd.Series(parent_first) + ' ' + pd.Series(last),
+        'parent_email': 'parent.' + handles + '@email.com',
+        'grade_level': rng.integers(9, 13, n_students),
+    })
+
+    school_days = pd.bdate_range(start_date, periods=n_days)
+
+    # Each student has an ability level; scores scatter around it
+    ability = rng.normal(80, 10, n_students)
+    grade_students = np.repeat(student_ids, n_assignments)
+    assignment_no = np.tile(np.arange(n_assignments), n_students)
+    scores = np.clip(rng.normal(ability[grade_students - 1], 8), 0, 100).round()
+    grade_days = school_days[(assignment_no * n_days) // max(n_assignments, 1)]
+    grades = pd.DataFrame({
+        'student_id': grade_students,
+        'assignment_name': 'Assignment ' + pd.Series(assignment_no + 1).astype(str),
+        'assignment_type': np.array(ASSIGNMENT_TYPES)[assignment_no % len(ASSIGNMENT_TYPES)],
+        'score': scores,
+        'max_score': 100,
+        'date': grade_days,
+    })
+
+    attendance = pd.DataFrame({
+        'student_id': np.repeat(student_ids, n_days),
+        'date': np.tile(school_days, n_students),
+        'status': rng.choice(ATTENDANCE_STATUSES, n_students * n_days, p=ATTENDANCE_WEIGHTS),
+        'notes': '',
+    })
+
+    n_incidents = int(n_students * incidents_per_student)
+    behavior = pd.DataFrame({
+        'student_id': rng.choice(student_ids, n_incidents),
+        'date': rng.choice(school_days, n_incidents),
+        'incident_type': rng.choice(INCIDENT_TYPES, n_incidents),
+        'severity': rng.choice(SEVERITIES, n_incidents),
+        'description': 'Synthetic incident',
+    })
+
+    return students, grades, attendance, behavior
+
+
+def write_roster(data_dir, n_students, **kwargs):
+    """Generate a roster and write the four CSV files into data_dir."""
+    os.makedirs(data_dir, exist_ok=True)
+    frames = generate_roster(n_students, **kwargs)
+    for filename, df in zip(['students.csv', 'grades.csv', 'attendance.csv', 'behavior.csv'], frames):
+        df.to_csv(os.path.join(data_dir, filename), index=False, date_format='%Y-%m-%d')
+    return frames
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python utils/synthetic_data.py <output_dir> <n_students>")
+        sys.exit(1)
+
+    data_dir, n_students = sys.argv[1], int(sys.argv[2])
+    frames = write_roster(data_dir, n_students)
+    print(f"✅ Wrote synthetic roster to {data_dir}")
+    for name, df in zip(['students', 'grades', 'attendance', 'behavior'], frames):
+        print(f"   → {name}.csv: {len(df)} rows")
+
+
+if __name__ == "__main__":
+    main()
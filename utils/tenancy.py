@@ -0,0 +1,253 @@
+"""
+Multi-teacher tenancy: per-tenant data roots behind a memory-bounded LRU cache.
+
+Each tenant (teacher) has their own folder under ``data/tenants/<tenant>/``
+with the usual four CSV files. Loaded tenants share nothing; the cache keeps
+the most recently used ones in memory up to a global budget and evicts idle
+tenants first.
+
+A session is bound to one tenant by an unguessable access token (see
+``issue_token``). Only SHA-256 hashes of the tokens are stored, in
+``data/tenants/access.json``. Listing and picking tenants freely is reserved
+for admin mode (``TAD_ADMIN_MODE=1``).
+"""
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from utils.data_loader import get_data_path
+from utils.data_store import DataStore
+from utils.precompute_worker import PrecomputeWorker
+
+# Override with the TAD_CACHE_BUDGET_MB environment variable
+DEFAULT_MEMORY_BUDGET_MB = 512
+
+
+def get_tenants_dir() -> str:
+    return get_data_path("tenants")
+
+
+def list_tenants() -> List[str]:
+    """Tenant folders that contain a students.csv, sorted by name."""
+    tenants_dir = get_tenants_dir()
+    if not os.path.isdir(tenants_dir):
+        return []
+    return sorted(
+        entry.name for entry in os.scandir(tenants_dir)
+        if entry.is_dir() and os.path.exists(os.path.join(entry.path, "students.csv"))
+    )
+
+
+def admin_mode() -> bool:
+    """True when the TAD_ADMIN_MODE environment variable allows picking any tenant."""
+    return os.environ.get("TAD_ADMIN_MODE", "").strip().lower() in ("1", "true", "yes")
+
+
+def get_access_file() -> str:
+    return os.path.join(get_tenants_dir(), "access.json")
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+_access_lock = threading.Lock()
+_access_cache: Dict = {'stat': None, 'tokens': {}}
+
+
+def _read_access() -> Dict[str, str]:
+    """Token hash -> tenant, re-read only when the file changes."""
+    try:
+        stat = os.stat(get_access_file())
+    except FileNotFoundError:
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _access_lock:
+        if _access_cache['stat'] != key:
+            with open(get_access_file()) as f:
+                _access_cache['tokens'] = json.load(f)
+            _access_cache['stat'] = key
+        return _access_cache['tokens']
+
+
+def _write_access(tokens: Dict[str, str]):
+    os.makedirs(get_tenants_dir(), exist_ok=True)
+    path = get_access_file()
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "w") as f:
+        json.dump(tokens, f, indent=2, sort_keys=True)
+    os.replace(temp, path)
+
+
+def issue_token(tenant: str) -> str:
+    """Create a new access token for a tenant; only its hash is stored."""
+    if tenant not in list_tenants():
+        raise ValueError(f"Unknown tenant: {tenant}")
+    token = secrets.token_urlsafe(24)
+    tokens = dict(_read_access())
+    tokens[_token_hash(token)] = tenant
+    _write_access(tokens)
+    return token
+
+
+def revoke_tokens(tenant: str) -> int:
+    """Remove every access token of a tenant; returns how many were removed."""
+    tokens = _read_access()
+    kept = {digest: owner for digest, owner in tokens.items() if owner != tenant}
+    if len(kept) != len(tokens):
+        _write_access(kept)
+    return len(tokens) - len(kept)
+
+
+def token_counts() -> Dict[str, int]:
+    """Number of active access tokens per tenant."""
+    counts = {tenant: 0 for tenant in list_tenants()}
+    for tenant in _read_access().values():
+        if tenant in counts:
+            counts[tenant] += 1
+    return counts
+
+
+def tenant_for_token(token: Optional[str]) -> Optional[str]:
+    """Tenant an access token belongs to, or None for a missing or unknown token."""
+    if not token:
+        return None
+    tenant = _read_access().get(_token_hash(token))
+    return tenant if tenant in list_tenants() else None
+
+
+def get_tenant_data_dir(tenant: Optional[str]) -> Optional[str]:
+    """Data folder for a tenant; None means the default single-tenant data/ folder."""
+    if tenant is None:
+        return None
+    if tenant not in list_tenants():
+        raise ValueError(f"Unknown tenant: {tenant}")
+    return os.path.join(get_tenants_dir(), tenant)
+
+
+class TenantEntry:
+    """A loaded tenant: its data store, background worker and accounting."""
+
+    def __init__(self, tenant: Optional[str], store: DataStore, worker: PrecomputeWorker, load_seconds: float):
+        self.tenant = tenant
+        self.store = store
+        self.worker = worker
+        self.load_seconds = load_seconds
+        self.nbytes = 0
+        self.measured = None
+        self._measuring = threading.Lock()
+        self.remeasure()
+
+    def _measure_key(self):
+        snapshot, precomputed = self.store.snapshot, self.store.precomputed
+        profiles = (precomputed.computed_at, len(precomputed.emails)) if precomputed is not None else None
+        return snapshot.version, snapshot.built, profiles
+
+    def remeasure(self):
+        """Refresh the size estimate after a reload, new artifacts or new precomputed emails.
+
+        Callers must not hold the cache lock; concurrent callers skip instead of
+        measuring twice.
+        """
+        if self._measure_key() == self.measured or not self._measuring.acquire(blocking=False):
+            return
+        try:
+            key = self._measure_key()
+            nbytes = self.store.snapshot.memory_usage()
+            precomputed = self.store.precomputed
+            if precomputed is not None:
+                nbytes += precomputed.memory_usage()
+            self.nbytes, self.measured = nbytes, key
+        finally:
+            self._measuring.release()
+
+
+class TenantCache:
+    """LRU cache of loaded tenants under a global memory budget.
+
+    The most recently used tenant is never evicted, even if it alone
+    exceeds the budget.
+    """
+
+    def __init__(self, memory_budget_mb: Optional[float] = None):
+        if memory_budget_mb is None:
+            memory_budget_mb = float(os.environ.get("TAD_CACHE_BUDGET_MB", DEFAULT_MEMORY_BUDGET_MB))
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.last_cold_load: Dict[Optional[str], float] = {}
+        self._entries: "OrderedDict[Optional[str], TenantEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[Optional[str], threading.Lock] = {}
+
+    def get(self, tenant: Optional[str]) -> TenantEntry:
+        """Loaded entry for a tenant, loading it (cold) on a miss."""
+        with self._lock:
+            entry = self._entries.get(tenant)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(tenant)
+            else:
+                load_lock = self._loading.setdefault(tenant, threading.Lock())
+        if entry is not None:
+            # Measuring can take a moment on large rosters; other tenants' lookups don't wait for it
+            entry.remeasure()
+            with self._lock:
+                self._evict()
+            return entry
+
+        # Load outside the cache lock so other tenants stay responsive;
+        # concurrent requests for the same cold tenant wait for one load
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(tenant)
+                if entry is not None:
+                    self.hits += 1
+                    self._entries.move_to_end(tenant)
+                    return entry
+                self.misses += 1
+
+            entry = self._load(tenant)
+            with self._lock:
+                self._entries[tenant] = entry
+                self.last_cold_load[tenant] = entry.load_seconds
+                self._evict()
+            return entry
+
+    def _load(self, tenant: Optional[str]) -> TenantEntry:
+        start = time.perf_counter()
+        store = DataStore(get_tenant_data_dir(tenant))
+        store.reload()
+        worker = PrecomputeWorker(store)
+        worker.start()
+        return TenantEntry(tenant, store, worker, time.perf_counter() - start)
+
+    def _evict(self):
+        """Drop least recently used tenants until under budget (caller holds the lock)."""
+        while len(self._entries) > 1 and self.memory_usage() > self.memory_budget:
+            _, entry = self._entries.popitem(last=False)
+            entry.worker.stop()
+            self.evictions += 1
+
+    def memory_usage(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters and current memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'tenants_loaded': len(self._entries),
+                'memory_mb': self.memory_usage() / 1024 / 1024,
+                'budget_mb': self.memory_budget / 1024 / 1024,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
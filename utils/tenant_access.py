@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tenant Access Links
+Issues and revokes the personal access tokens that bind a teacher's browser
+session (and API clients) to their own roster under data/tenants/<teacher>/
+
+Usage: python utils/tenant_access.py issue <teacher> [--url http://localhost:8501]
+       python utils/tenant_access.py revoke <teacher>
+       python utils/tenant_access.py list
+"""
+
+import argparse
+import os
+import sys
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.tenancy import issue_token, revoke_tokens, token_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage per-teacher access links")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    issue = subparsers.add_parser('issue', help="Create a new access link for a teacher")
+    issue.add_argument('tenant', help="Folder name under data/tenants/")
+    issue.add_argument('--url', default='http://localhost:8501', help="Public address of the dashboard")
+    revoke = subparsers.add_parser('revoke', help="Invalidate every access link of a teacher")
+    revoke.add_argument('tenant', help="Folder name under data/tenants/")
+    subparsers.add_parser('list', help="Show teachers and how many links each has")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("🔑 Tenant Access Links")
+    print("="*60)
+
+    if args.command == 'issue':
+        try:
+            token = issue_token(args.tenant)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ New access link for {args.tenant}:")
+        print(f"   {args.url.rstrip('/')}/?{urlencode({'token': token})}")
+        print(f"   API clients send: Authorization: Bearer {token}")
+        print("💡 The token is shown only once; share it with this teacher only")
+    elif args.command == 'revoke':
+        removed = revoke_tokens(args.tenant)
+        print(f"✅ Revoked {removed} access link(s) for {args.tenant}")
+    else:
+        counts = token_counts()
+        if not counts:
+            print("No tenant folders found")
+        for tenant, count in counts.items():
+            print(f"  {tenant:30s} {count} link(s)")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+What-if explorer for EmailGenerator thresholds.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils.alert_rules import AlertResults
+from utils.summary_table import SummaryTable
+
+
+class ThresholdExplorer:
+    """Counts how many emails each tier would trigger for any thresholds.
+
+    Grade and attendance values are sorted once, and every student keeps its
+    rank in that order. A cutoff then becomes one ``searchsorted`` and a rank
+    comparison, and single-criterion counts come straight from the sorted
+    arrays or the incident histogram without touching the roster.
+    """
+
+    def __init__(self, summaries: SummaryTable, alerts: Optional[AlertResults] = None):
+        grades = summaries.column('average_grade')
+        attendance = summaries.column('attendance_rate')
+        self.incidents = summaries.column('negative_incidents')
+        self.declining = summaries.column('declining_grades')
+        self.size = len(summaries)
+        # Alert rules turn on their routed emails regardless of thresholds
+        self.alert_tiers = alerts.tier_masks() if alerts is not None else {
+            tier: np.zeros(self.size, dtype=bool) for tier in ('to_parent', 'to_student', 'to_admin')
+        }
+
+        grade_order = np.argsort(grades, kind='stable')
+        self.sorted_grades = grades[grade_order]
+        self.grade_ranks = np.empty(self.size, dtype=np.int32)
+        self.grade_ranks[grade_order] = np.arange(self.size, dtype=np.int32)
+
+        attendance_order = np.argsort(attendance, kind='stable')
+        self.sorted_attendance = attendance[attendance_order]
+        self.attendance_ranks = np.empty(self.size, dtype=np.int32)
+        self.attendance_ranks[attendance_order] = np.arange(self.size, dtype=np.int32)
+
+        # students_with_at_least[k] = number of students with k or more incidents
+        histogram = np.bincount(self.incidents.astype(np.int64), minlength=1)
+        self.students_with_at_least = np.append(np.cumsum(histogram[::-1])[::-1], 0)
+
+    def below_grade(self, cutoff: float) -> int:
+        """Students with an average strictly below cutoff."""
+        return int(np.searchsorted(self.sorted_grades, cutoff, side='left'))
+
+    def below_attendance(self, cutoff: float) -> int:
+        """Students with an attendance rate strictly below cutoff."""
+        return int(np.searchsorted(self.sorted_attendance, cutoff, side='left'))
+
+    def at_least_incidents(self, cutoff: int) -> int:
+        """Students with cutoff or more negative incidents."""
+        cutoff = int(min(max(cutoff, 0), len(self.students_with_at_least) - 1))
+        return int(self.students_with_at_least[cutoff])
+
+    def _grade_mask(self, cutoff: float) -> np.ndarray:
+        return self.grade_ranks < self.below_grade(cutoff)
+
+    def _attendance_mask(self, cutoff: float) -> np.ndarray:
+        return self.attendance_ranks < self.below_attendance(cutoff)
+
+    def masks(self, thresholds: Dict[str, float]) -> Dict[str, np.ndarray]:
+        """Per-tier boolean masks matching ``EmailGenerator.should_send_email``."""
+        low = self._grade_mask(thresholds['LOW_GRADE_THRESHOLD']) | \
+            self._attendance_mask(thresholds['LOW_ATTENDANCE_THRESHOLD']) | self.declining
+        return {
+            'to_parent': low | (self.incidents >= thresholds['MULTIPLE_INCIDENTS_THRESHOLD']) |
+            self.alert_tiers['to_parent'],
+            'to_student': low | self.alert_tiers['to_student'],
+            'to_admin': (
+                self._grade_mask(thresholds['CRITICAL_GRADE_THRESHOLD']) |
+                self._attendance_mask(thresholds['CRITICAL_ATTENDANCE_THRESHOLD']) |
+                (self.incidents >= thresholds['ADMIN_INCIDENTS_THRESHOLD']) |
+                self.alert_tiers['to_admin']
+            ),
+        }
+
+    def counts(self, thresholds: Dict[str, float]) -> Dict[str, int]:
+        """Emails per tier, plus the number of students getting any email."""
+        masks = self.masks(thresholds)
+        counts = {tier: int(np.count_nonzero(mask)) for tier, mask in masks.items()}
+        counts['any'] = int(np.count_nonzero(masks['to_parent'] | masks['to_student'] | masks['to_admin']))
+        return counts